@@ -0,0 +1,212 @@
+import asyncio
+import contextvars
+import inspect
+import math
+import time
+from contextlib import asynccontextmanager
+
+from fastapi.responses import JSONResponse
+
+LANES = ("interactive", "batch")
+DEFAULT_STAGE_LIMITS = {"extract": 2, "model": 4}
+DEFAULT_MAX_QUEUE = {"interactive": 16, "batch": 4}
+DEFAULT_MAX_BUFFERED_BYTES = 256 * 1024 * 1024
+
+current_lane = contextvars.ContextVar("current_lane", default="interactive")
+current_reservation = contextvars.ContextVar("current_reservation", default=None)
+
+
+class Shed(Exception):
+    def __init__(self, status_code: int, reason: str, retry_after: int | None = None):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.reason = reason
+        # None when retrying can't help (the upload itself is too large)
+        self.retry_after = retry_after
+
+    def response(self) -> JSONResponse:
+        headers = {"Retry-After": str(self.retry_after)} if self.retry_after is not None else None
+        return JSONResponse(content={"error": self.reason}, status_code=self.status_code, headers=headers)
+
+
+def after_body(response, callback):
+    """Run callback() once a middleware's response body has been sent, or sending failed.
+
+    call_next returns as soon as the headers are out, so per-request state
+    (a reservation, a profile) would otherwise end before a streamed body
+    (e.g. NDJSON still waiting on the model) has been produced.
+    """
+    body = response.body_iterator
+
+    async def wrapped():
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            result = callback()
+            if inspect.isawaitable(result):
+                await result
+
+    response.body_iterator = wrapped()
+
+
+# === Per-Stage In-Flight Limit ===
+class _Stage:
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_flight = 0
+        self.waiting = {lane: 0 for lane in LANES}
+        self.avg_seconds = 1.0
+        self.cond = asyncio.Condition()
+
+    def can_run(self, lane: str) -> bool:
+        if self.in_flight >= self.limit:
+            return False
+        # Batch work only takes a free slot when no interactive request is queued
+        return lane == "interactive" or self.waiting["interactive"] == 0
+
+    def retry_after(self) -> int:
+        queued = sum(self.waiting.values()) + 1
+        return max(1, math.ceil(queued * self.avg_seconds / self.limit))
+
+    def status(self) -> dict:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "waiting": dict(self.waiting),
+            "avg_seconds": round(self.avg_seconds, 3),
+        }
+
+
+class Reservation:
+    """Buffered bytes one request holds, grown as its body arrives.
+
+    The declared Content-Length is reserved before the body is read; a
+    chunked body, or one longer than it claimed, is charged by the upload
+    parser (StreamingUpload) through cover().
+    """
+
+    def __init__(self, controller):
+        self.controller = controller
+        self.nbytes = 0
+
+    def cover(self, total: int):
+        if total > self.nbytes:
+            self.controller.reserve(total - self.nbytes, held=self.nbytes)
+            self.nbytes = total
+
+    def release(self):
+        self.controller.release(self.nbytes)
+        self.nbytes = 0
+
+
+def content_length(headers) -> int | None:
+    """The Content-Length header as a byte count; 0 when absent, None when malformed"""
+    value = headers.get("content-length")
+    if value is None:
+        return 0
+    value = value.strip()
+    return int(value) if value.isdigit() else None
+
+
+# === Admission Controller ===
+class AdmissionController:
+    def __init__(self, stage_limits=None, max_queue=None, max_buffered_bytes=DEFAULT_MAX_BUFFERED_BYTES):
+        self.stages = {name: _Stage(limit) for name, limit in (stage_limits or DEFAULT_STAGE_LIMITS).items()}
+        self.max_queue = dict(max_queue or DEFAULT_MAX_QUEUE)
+        self.max_buffered_bytes = max_buffered_bytes
+        self.buffered_bytes = 0
+        self.shed_counts = {"queue_full": 0, "memory": 0, "too_large": 0}
+
+    def reserve(self, nbytes: int, held: int = 0):
+        """Charge nbytes more to a request already holding `held` bytes"""
+        if held + nbytes > self.max_buffered_bytes:
+            self.shed_counts["too_large"] += 1
+            raise Shed(413, "Upload exceeds the service's buffering limit")
+        if self.buffered_bytes + nbytes > self.max_buffered_bytes:
+            self.shed_counts["memory"] += 1
+            raise Shed(503, "Server is buffering too many uploads, retry later", self.retry_after())
+        self.buffered_bytes += nbytes
+
+    def release(self, nbytes: int):
+        self.buffered_bytes -= nbytes
+
+    def retry_after(self) -> int:
+        return max(stage.retry_after() for stage in self.stages.values())
+
+    @asynccontextmanager
+    async def stage(self, name: str):
+        """Hold one in-flight slot of a stage, queueing by the request's lane"""
+        stage = self.stages[name]
+        lane = current_lane.get()
+        async with stage.cond:
+            if not stage.can_run(lane):
+                if stage.waiting[lane] >= self.max_queue[lane]:
+                    self.shed_counts["queue_full"] += 1
+                    raise Shed(429, f"Too many queued {lane} requests for {name}", stage.retry_after())
+                stage.waiting[lane] += 1
+                try:
+                    await stage.cond.wait_for(lambda: stage.can_run(lane))
+                finally:
+                    stage.waiting[lane] -= 1
+            stage.in_flight += 1
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            stage.avg_seconds = 0.8 * stage.avg_seconds + 0.2 * elapsed
+            async with stage.cond:
+                stage.in_flight -= 1
+                stage.cond.notify_all()
+
+    def status(self) -> dict:
+        return {
+            "buffered_bytes": self.buffered_bytes,
+            "max_buffered_bytes": self.max_buffered_bytes,
+            "max_queue": dict(self.max_queue),
+            "stages": {name: stage.status() for name, stage in self.stages.items()},
+            "shed": dict(self.shed_counts),
+        }
+
+    def install(self, app, paths=("/idea-capture",)):
+        """Admit uploads before their body is read and expose GET /admission"""
+
+        @app.exception_handler(Shed)
+        async def shed_handler(request, shed):
+            return shed.response()
+
+        @app.middleware("http")
+        async def admit(request, call_next):
+            if request.url.path not in paths:
+                return await call_next(request)
+
+            lane = request.headers.get("X-Priority", "interactive")
+            if lane not in LANES:
+                lane = "interactive"
+            nbytes = content_length(request.headers)
+            if nbytes is None:
+                return JSONResponse(content={"error": "Invalid Content-Length header"}, status_code=400)
+            reservation = Reservation(self)
+            try:
+                reservation.cover(nbytes)
+            except Shed as shed:
+                return shed.response()
+
+            lane_token = current_lane.set(lane)
+            reservation_token = current_reservation.set(reservation)
+            try:
+                response = await call_next(request)
+            except BaseException:
+                reservation.release()
+                raise
+            finally:
+                current_reservation.reset(reservation_token)
+                current_lane.reset(lane_token)
+            after_body(response, reservation.release)
+            return response
+
+        @app.get("/admission")
+        async def admission_status():
+            return self.status()
@@ -0,0 +1,309 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from fastapi import HTTPException, Query
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    id INTEGER PRIMARY KEY,
+    created_at REAL NOT NULL,
+    deck_hash TEXT NOT NULL,
+    prompt_version TEXT NOT NULL,
+    model TEXT NOT NULL,
+    typed_input TEXT,
+    title TEXT,
+    audience TEXT,
+    result_json TEXT NOT NULL,
+    timings_json TEXT
+);
+CREATE INDEX IF NOT EXISTS analyses_created_at ON analyses (created_at);
+CREATE INDEX IF NOT EXISTS analyses_deck_hash ON analyses (deck_hash, prompt_version);
+
+CREATE TABLE IF NOT EXISTS analysis_tags (
+    tag TEXT NOT NULL,
+    analysis_id INTEGER NOT NULL REFERENCES analyses (id) ON DELETE CASCADE,
+    PRIMARY KEY (tag, analysis_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS analysis_audience (
+    audience TEXT NOT NULL,
+    analysis_id INTEGER NOT NULL REFERENCES analyses (id) ON DELETE CASCADE,
+    PRIMARY KEY (audience, analysis_id)
+) WITHOUT ROWID;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS analyses_fts USING fts5 (
+    title, description, problem_statements
+);
+
+-- Local feature candidates merged into an analysis' response, kept apart from the model's result
+CREATE TABLE IF NOT EXISTS analysis_features (
+    analysis_id INTEGER PRIMARY KEY REFERENCES analyses (id) ON DELETE CASCADE,
+    features_json TEXT NOT NULL
+);
+
+-- deck_features' TF-IDF corpus: each distinct deck once, and how many decks contain each term
+CREATE TABLE IF NOT EXISTS feature_decks (
+    id INTEGER PRIMARY KEY,
+    deck_hash TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS feature_terms (
+    term TEXT PRIMARY KEY,
+    decks INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+MAX_PAGE_SIZE = 100
+# Filter selectivity is estimated by counting matches up to this many
+ESTIMATE_CAP = 1000
+
+
+def _normalise(value: str) -> str:
+    return " ".join(value.lower().split())
+
+
+def split_audience(audience) -> list[str]:
+    if isinstance(audience, list):
+        parts = audience
+    else:
+        parts = str(audience or "").split(",")
+    return [p for p in (_normalise(str(part)) for part in parts) if p]
+
+
+# === Analysis Store ===
+class AnalysisStore:
+    """Every /idea-capture result in SQLite, indexed by tag, audience and date with FTS5 search.
+
+    Like SharedState, each process opens its own connection and reopens it
+    after a fork, so a store built at import time works under gunicorn --preload.
+    """
+
+    def __init__(self, path="analyses.db"):
+        self.path = path
+        self.lock = threading.Lock()
+        self.pid = None
+        self._conn = None
+        with self.lock:
+            self.conn.executescript(SCHEMA)
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        # Callers hold self.lock
+        if self.pid != os.getpid():
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._conn = conn
+            self.pid = os.getpid()
+        return self._conn
+
+    def save(self, result: dict, deck_hash: str, prompt_version: str, model: str,
+             typed_input: str = "", timings: dict | None = None, features: dict | None = None) -> int:
+        """Store the model's result; `features` (local candidates) are kept alongside, not in it"""
+        tags = {_normalise(str(tag)) for tag in result.get("tags") or [] if str(tag).strip()}
+        audience = set(split_audience(result.get("audience")))
+        problems = result.get("problemStatements") or []
+        with self.lock, self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO analyses (created_at, deck_hash, prompt_version, model, typed_input,"
+                " title, audience, result_json, timings_json) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    time.time(), deck_hash, prompt_version, model, typed_input,
+                    str(result.get("title", "")), str(result.get("audience", "")),
+                    json.dumps(result), json.dumps(timings or {}),
+                ),
+            )
+            analysis_id = cursor.lastrowid
+            self.conn.executemany(
+                "INSERT INTO analysis_tags (tag, analysis_id) VALUES (?, ?)",
+                [(tag, analysis_id) for tag in tags],
+            )
+            self.conn.executemany(
+                "INSERT INTO analysis_audience (audience, analysis_id) VALUES (?, ?)",
+                [(segment, analysis_id) for segment in audience],
+            )
+            self.conn.execute(
+                "INSERT INTO analyses_fts (rowid, title, description, problem_statements) VALUES (?, ?, ?, ?)",
+                (
+                    analysis_id, str(result.get("title", "")), str(result.get("description", "")),
+                    "\n".join(str(p) for p in problems),
+                ),
+            )
+            if features is not None:
+                self.conn.execute(
+                    "INSERT INTO analysis_features (analysis_id, features_json) VALUES (?, ?)",
+                    (analysis_id, json.dumps(features)),
+                )
+        return analysis_id
+
+    def get(self, analysis_id: int) -> dict | None:
+        with self.lock:
+            row = self.conn.execute("SELECT * FROM analyses WHERE id = ?", (analysis_id,)).fetchone()
+        return self._row(row) if row else None
+
+    def lookup(self, deck_hash: str, prompt_version: str, model: str,
+               typed_input: str) -> tuple[dict, dict | None] | None:
+        """Latest stored (result, features) for the same deck, notes, prompt and model"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT a.result_json, f.features_json FROM analyses a"
+                " LEFT JOIN analysis_features f ON f.analysis_id = a.id"
+                " WHERE a.deck_hash = ? AND a.prompt_version = ? AND a.model = ? AND a.typed_input = ?"
+                " ORDER BY a.id DESC LIMIT 1",
+                (deck_hash, prompt_version, model, typed_input),
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), json.loads(row[1]) if row[1] else None
+
+    def _id_at(self, created_at: float):
+        """First analysis id at or after a timestamp (ids grow with created_at)"""
+        row = self.conn.execute(
+            "SELECT id FROM analyses WHERE created_at >= ? ORDER BY created_at LIMIT 1", (created_at,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _estimate(self, table, id_col, condition, value) -> int:
+        """Matches of one filter, counted up to ESTIMATE_CAP"""
+        return self.conn.execute(
+            f"SELECT COUNT(*) FROM (SELECT 1 FROM {table} WHERE {condition} LIMIT ?)", (value, ESTIMATE_CAP)
+        ).fetchone()[0]
+
+    def search(self, q=None, tag=None, audience=None, since=None, until=None,
+               limit=20, before_id=None) -> dict:
+        """Newest first; pass the returned next_cursor as before_id for the next page"""
+        # Drive the scan from the most selective filter, walking ids in descending
+        # order so a page stops after `limit` matches instead of sorting all hits.
+        # The other filters are checked per row; FTS comes first so it drives ties,
+        # since a per-row MATCH is the most expensive check
+        filters = []
+        if q:
+            filters.append(("analyses_fts", "rowid", "analyses_fts MATCH ?", q))
+        if tag:
+            filters.append(("analysis_tags", "analysis_id", "tag = ?", _normalise(tag)))
+        if audience:
+            filters.append(("analysis_audience", "analysis_id", "audience = ?", _normalise(audience)))
+
+        with self.lock:
+            if len(filters) > 1:
+                estimates = [self._estimate(*f) for f in filters]
+                if 0 in estimates:
+                    return {"items": [], "next_cursor": None}
+                filters = [f for _, f in sorted(zip(estimates, filters), key=lambda pair: pair[0])]
+
+            low = high = None
+            if since is not None:
+                low = self._id_at(since)
+                if low is None:
+                    return {"items": [], "next_cursor": None}
+            if until is not None:
+                high = self._id_at(until)
+            if before_id is not None:
+                high = before_id if high is None else min(high, before_id)
+
+            if filters:
+                table, id_col, condition, value = filters[0]
+                sql = f"SELECT a.* FROM {table} d JOIN analyses a ON a.id = d.{id_col} WHERE d.{condition}"
+                params = [value]
+                driver_id = f"d.{id_col}"
+            else:
+                sql = "SELECT a.* FROM analyses a WHERE 1"
+                params = []
+                driver_id = "a.id"
+            for table, id_col, condition, value in filters[1:]:
+                sql += f" AND EXISTS (SELECT 1 FROM {table} WHERE {condition} AND {id_col} = a.id)"
+                params.append(value)
+            if low is not None:
+                sql += f" AND {driver_id} >= ?"
+                params.append(low)
+            if high is not None:
+                sql += f" AND {driver_id} < ?"
+                params.append(high)
+
+            limit = max(1, min(limit, MAX_PAGE_SIZE))
+            sql += f" ORDER BY {driver_id} DESC LIMIT ?"
+            rows = self.conn.execute(sql, (*params, limit + 1)).fetchall()
+
+        items = [self._row(row) for row in rows[:limit]]
+        next_cursor = items[-1]["id"] if len(rows) > limit else None
+        return {"items": items, "next_cursor": next_cursor}
+
+    # === Deck Feature Corpus ===
+    def vocabulary(self, min_count: int = 1) -> tuple[list[str], list[str]]:
+        """Tags and audience segments the model has produced at least min_count times"""
+        with self.lock:
+            tags = self.conn.execute(
+                "SELECT tag FROM analysis_tags GROUP BY tag HAVING COUNT(*) >= ?", (min_count,)
+            ).fetchall()
+            audience = self.conn.execute(
+                "SELECT audience FROM analysis_audience GROUP BY audience HAVING COUNT(*) >= ?", (min_count,)
+            ).fetchall()
+        return [row[0] for row in tags], [row[0] for row in audience]
+
+    def save_deck_terms(self, deck_hash: str, terms) -> bool:
+        """Count a deck's distinct terms once; False if the deck was already counted"""
+        with self.lock, self.conn:
+            cursor = self.conn.execute("INSERT OR IGNORE INTO feature_decks (deck_hash) VALUES (?)", (deck_hash,))
+            if cursor.rowcount == 0:
+                return False
+            self.conn.executemany(
+                "INSERT INTO feature_terms (term, decks) VALUES (?, 1)"
+                " ON CONFLICT (term) DO UPDATE SET decks = decks + 1",
+                [(term,) for term in terms],
+            )
+        return True
+
+    def document_frequencies(self, terms) -> tuple[int, dict]:
+        """(number of decks, term -> number of decks containing it) for just these terms"""
+        with self.lock:
+            # feature_decks is never deleted from, so the largest id is the row count
+            documents = self.conn.execute("SELECT MAX(id) FROM feature_decks").fetchone()[0] or 0
+            rows = self.conn.execute(
+                "SELECT t.term, t.decks FROM json_each(?) j JOIN feature_terms t ON t.term = j.value",
+                (json.dumps(list(terms)),),
+            ).fetchall()
+        return documents, {term: decks for term, decks in rows}
+
+    @staticmethod
+    def _row(row) -> dict:
+        return {
+            "id": row["id"],
+            "created_at": row["created_at"],
+            "deck_hash": row["deck_hash"],
+            "prompt_version": row["prompt_version"],
+            "model": row["model"],
+            "typed_input": row["typed_input"],
+            "timings": json.loads(row["timings_json"] or "{}"),
+            "result": json.loads(row["result_json"]),
+        }
+
+    def install(self, app):
+        """Expose GET /analyses (filtered, paginated) and GET /analyses/{id}"""
+
+        @app.get("/analyses")
+        def list_analyses(
+            q: str | None = None,
+            tag: str | None = None,
+            audience: str | None = None,
+            since: float | None = None,
+            until: float | None = None,
+            limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+            cursor: int | None = None,
+        ):
+            try:
+                return self.search(q, tag, audience, since, until, limit, cursor)
+            except sqlite3.OperationalError as e:
+                # Malformed FTS5 query syntax
+                raise HTTPException(status_code=400, detail=str(e))
+
+        @app.get("/analyses/{analysis_id}")
+        def get_analysis(analysis_id: int):
+            analysis = self.get(analysis_id)
+            if analysis is None:
+                raise HTTPException(status_code=404, detail="Analysis not found")
+            return analysis
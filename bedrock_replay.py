@@ -0,0 +1,182 @@
+import base64
+import hashlib
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+
+# Streams are recorded to / replayed from one JSON "cassette" per request.
+# clients.bedrock_runtime() swaps these in when BEDROCK_RECORD_DIR or
+# BEDROCK_REPLAY_DIR is set, so every entry point can be load-tested offline.
+
+
+def request_key(model_id: str, body: str) -> str:
+    """Cassettes match on model and messages; inferenceConfig varies with the inference policy"""
+    messages = json.loads(body).get("messages")
+    raw = json.dumps([model_id, messages], sort_keys=True).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()
+
+
+def _encode_event(event: dict) -> dict:
+    if "chunk" in event:
+        return {"chunk": base64.b64encode(event["chunk"]["bytes"]).decode("ascii")}
+    return {"event": event}
+
+
+def _decode_event(encoded: dict) -> dict:
+    if "chunk" in encoded:
+        return {"chunk": {"bytes": base64.b64decode(encoded["chunk"])}}
+    return encoded["event"]
+
+
+# === Recording ===
+class RecordingStream:
+    """Passes a response stream through, noting each event's offset from the request start"""
+
+    def __init__(self, stream, path: str, model_id: str, start: float, opened: float):
+        self.stream = stream
+        self.path = path
+        self.model_id = model_id
+        self.start = start
+        self.opened = opened
+        self.events = []
+        self.saved = False
+
+    def __iter__(self):
+        try:
+            for event in self.stream:
+                self.events.append([time.perf_counter() - self.start, _encode_event(event)])
+                yield event
+        finally:
+            self._save(closed=False)
+
+    def close(self):
+        self.stream.close()
+        self._save(closed=True)
+
+    def _save(self, closed: bool):
+        if self.saved:
+            return
+        self.saved = True
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "model_id": self.model_id,
+                "opened": self.opened,
+                "closed_early": closed,
+                "events": self.events,
+            }, f)
+        os.replace(tmp_path, self.path)
+
+
+class RecordingClient:
+    """bedrock-runtime client wrapper that records every response stream to `directory`"""
+
+    def __init__(self, client, directory: str):
+        self.client = client
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def invoke_model_with_response_stream(self, **kwargs):
+        start = time.perf_counter()
+        response = self.client.invoke_model_with_response_stream(**kwargs)
+        opened = time.perf_counter() - start
+        path = os.path.join(self.directory, request_key(kwargs["modelId"], kwargs["body"]) + ".json")
+        response["body"] = RecordingStream(response["body"], path, kwargs["modelId"], start, opened)
+        return response
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+
+# === Replay ===
+class ReplayStream:
+    def __init__(self, cassette: dict, speed: float):
+        self.cassette = cassette
+        self.speed = speed
+        self.closed = False
+
+    def __iter__(self):
+        previous = self.cassette["opened"]
+        for offset, encoded in self.cassette["events"]:
+            if self.closed:
+                return
+            if self.speed > 0:
+                time.sleep(max(0.0, offset - previous) / self.speed)
+            previous = offset
+            yield _decode_event(encoded)
+
+    def close(self):
+        self.closed = True
+
+
+class ReplayClient:
+    """Stands in for the bedrock-runtime client, serving recorded streams.
+
+    A request replays its own cassette when one was recorded; otherwise the
+    cassettes are served round-robin, so a small recording drives any load.
+    speed scales the recorded timing (1 = original, 10 = ten times faster,
+    0 = no delays). Throttling is injected either at random (`throttle`
+    probability per call) or above `max_rps` calls per second, raising the
+    same ThrottlingException botocore would.
+    """
+
+    def __init__(self, directory: str, speed: float = 1.0, throttle: float = 0.0,
+                 max_rps: float | None = None, seed: int | None = None):
+        self.speed = speed
+        self.throttle = throttle
+        self.max_rps = max_rps
+        self.random = random.Random(seed)
+        self.cassettes = {}
+        for name in sorted(os.listdir(directory)):
+            if name.endswith(".json"):
+                with open(os.path.join(directory, name), encoding="utf-8") as f:
+                    self.cassettes[name[:-5]] = json.load(f)
+        if not self.cassettes:
+            raise ValueError(f"No recorded streams in {directory}")
+        self.cycle = itertools.cycle(list(self.cassettes.values()))
+        self.calls = deque()
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, directory: str) -> "ReplayClient":
+        max_rps = os.environ.get("BEDROCK_REPLAY_MAX_RPS")
+        return cls(
+            directory,
+            speed=float(os.environ.get("BEDROCK_REPLAY_SPEED", "1")),
+            throttle=float(os.environ.get("BEDROCK_REPLAY_THROTTLE", "0")),
+            max_rps=float(max_rps) if max_rps else None,
+        )
+
+    def _throttled(self) -> bool:
+        with self.lock:
+            if self.throttle and self.random.random() < self.throttle:
+                return True
+            if self.max_rps is None:
+                return False
+            now = time.monotonic()
+            while self.calls and now - self.calls[0] >= 1.0:
+                self.calls.popleft()
+            if len(self.calls) >= self.max_rps:
+                return True
+            self.calls.append(now)
+            return False
+
+    def invoke_model_with_response_stream(self, **kwargs):
+        if self._throttled():
+            from botocore.exceptions import ClientError
+
+            raise ClientError(
+                {"Error": {"Code": "ThrottlingException", "Message": "Too many requests (replay)"}},
+                "InvokeModelWithResponseStream",
+            )
+        cassette = self.cassettes.get(request_key(kwargs["modelId"], kwargs["body"]))
+        if cassette is None:
+            with self.lock:
+                cassette = next(self.cycle)
+        if self.speed > 0:
+            time.sleep(cassette["opened"] / self.speed)
+        return {"body": ReplayStream(cassette, self.speed)}
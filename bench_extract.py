@@ -0,0 +1,186 @@
+"""Benchmark for deck extraction on text-dense decks.
+
+    python bench_extract.py [deck.pdf ...] [--pages 20] [--lines 55] [--runs 5]
+
+Without PDFs a synthetic deck is generated: every page has a large bold
+heading, bold labels and dense body text. pdfminer's layout analysis
+(page.chars) is timed separately, then two segmentations run on the same
+chars: extract_words(use_text_flow=True) plus the per-word Python loops that
+extract_deck used before, and the single-pass numpy segment_page. Both must
+produce the same slides.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from deck_structure import (
+    BULLET_CHARS, HIGHLIGHT_MIN_SIZE, LINE_TOLERANCE, Slide, build_slide, extract_metrics, segment_page,
+)
+
+WORDS = (
+    "revenue growth enterprise platform customers pipeline retention margin workflow automation "
+    "market cloud analytics compliance onboarding partners pricing expansion churn forecast "
+    "logistics healthcare fintech integration latency security deployment pilot contract"
+).split()
+
+
+# === Synthetic Deck ===
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_dense_pdf(path: str, pages: int, lines: int, seed: int = 7):
+    """Minimal PDF with Helvetica / Helvetica-Bold text, no external dependencies"""
+    rng = random.Random(seed)
+    contents = []
+    for number in range(1, pages + 1):
+        ops = [f"BT /F2 26 Tf 40 800 Td ({_escape(f'Slide {number}: ' + rng.choice(WORDS).title())}) Tj ET"]
+        y = 770
+        for i in range(lines):
+            body = " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 14)))
+            if i % 6 == 0:
+                body += f" ${rng.randint(1, 90)}M at {rng.randint(5, 60)}% growth"
+            if i % 5 == 0:
+                ops.append(f"BT /F2 10 Tf 40 {y} Td ({_escape(rng.choice(WORDS).title() + ':')}) Tj ET")
+                ops.append(f"BT /F1 10 Tf 110 {y} Td ({_escape(body)}) Tj ET")
+            else:
+                ops.append(f"BT /F1 10 Tf 40 {y} Td ({_escape('- ' + body)}) Tj ET")
+            y -= 13
+        contents.append("\n".join(ops).encode("latin-1"))
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # pages, filled in below
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold >>",
+    ]
+    kids = []
+    for content in contents:
+        objects.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents %d 0 R"
+            b" /Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> >>" % len(objects)
+        )
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % kid for kid in kids), len(kids)
+    )
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+# === Previous Word-Based Segmentation (reference) ===
+def legacy_slide(number: int, page) -> Slide:
+    words = page.extract_words(use_text_flow=True, keep_blank_chars=False, extra_attrs=["size", "fontname"])
+
+    def is_highlight(word):
+        return float(word.get("size", 0)) >= HIGHLIGHT_MIN_SIZE or "bold" in word.get("fontname", "").lower()
+
+    lines, current, current_top = [], [], None
+    for word in words:
+        if current and abs(word["top"] - current_top) > LINE_TOLERANCE:
+            lines.append(current)
+            current = []
+        if not current:
+            current_top = word["top"]
+        current.append(word)
+    if current:
+        lines.append(current)
+
+    slide = Slide(number=number)
+    if not lines:
+        return slide
+    sizes = [round(max(float(w.get("size", 0)) for w in line)) for line in lines]
+    candidates = [i for i, size in enumerate(sizes) if size == max(sizes)]
+    title_index = next((i for i in candidates if all(is_highlight(w) for w in lines[i])), candidates[0])
+    slide.title = " ".join(w["text"] for w in lines[title_index]).strip()
+
+    seen = {slide.title}
+    for i, line in enumerate(lines):
+        text = " ".join(w["text"] for w in line).strip()
+        if i != title_index:
+            text = text.lstrip(BULLET_CHARS).strip()
+            if text and text[0].islower() and slide.bullets:
+                slide.bullets[-1] += " " + text
+            elif text:
+                slide.bullets.append(text)
+        slide.metrics.extend(extract_metrics(text))
+        run, spans = [], []
+        for word in line:
+            if is_highlight(word):
+                run.append(word["text"])
+            elif run:
+                if not run[-1].endswith(":"):
+                    spans.append(" ".join(run))
+                run = []
+        if run:
+            spans.append(" ".join(run))
+        for span in spans:
+            if span not in seen:
+                seen.add(span)
+                slide.highlights.append(span)
+    return slide
+
+
+def timed(fn, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pdfs", nargs="*")
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--lines", type=int, default=55)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    import pdfplumber
+
+    pdfs = args.pdfs
+    if not pdfs:
+        path = os.path.join(tempfile.mkdtemp(), "dense.pdf")
+        write_dense_pdf(path, args.pages, args.lines)
+        pdfs = [path]
+
+    for path in pdfs:
+        with pdfplumber.open(path) as pdf:
+            start = time.perf_counter()
+            for page in pdf.pages:
+                page.chars
+            parse_ms = (time.perf_counter() - start) * 1000
+            chars = sum(len(page.chars) for page in pdf.pages)
+
+            legacy = [legacy_slide(n, page) for n, page in enumerate(pdf.pages, 1)]
+            current = [build_slide(n, segment_page(page.chars)) for n, page in enumerate(pdf.pages, 1)]
+            if legacy != current:
+                print(f"{os.path.basename(path)}: outputs differ")
+
+            legacy_ms = timed(lambda: [legacy_slide(n, p) for n, p in enumerate(pdf.pages, 1)], args.runs)
+            current_ms = timed(
+                lambda: [build_slide(n, segment_page(p.chars)) for n, p in enumerate(pdf.pages, 1)], args.runs
+            )
+        print(f"{os.path.basename(path)}: {len(pdf.pages)} pages, {chars} chars, layout analysis {parse_ms:.1f} ms")
+        print(f"  extract_words + word loops {legacy_ms:8.1f} ms")
+        print(f"  segment_page (numpy)       {current_ms:8.1f} ms   {legacy_ms / current_ms:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Stage-level benchmark for the analysis pipeline.
+
+    python bench_pipeline.py input.pdf [more.pdf ...] [--runs 10] [--prompt v8] [--model stub|nova-micro|nova-pro]
+
+Each deck is run through extract -> pack -> prompt -> model -> parse -> validate
+and the per-stage wall time is reported (median / p95 in ms). The default stub
+model returns a fixed schema-valid answer, so only local stages are measured;
+pass a Nova model to include Bedrock latency.
+"""
+import argparse
+import json
+import statistics
+
+from deck_structure import extract_deck
+from pipeline import (
+    NOVA_MICRO_ARN, NOVA_PRO_ARN, PROMPTS, NovaClient, Pipeline, TimingHook, parse_json, single_pass, validate,
+)
+
+STAGES = ("extract", "pack", "prompt", "model", "parse", "validate")
+
+STUB_OUTPUT = json.dumps({
+    "title": "Stub",
+    "description": "Stub analysis",
+    "audience": "Analysts",
+    "problemStatements": ["a", "b", "c"],
+    "tags": ["stub"],
+    "followUpQuestions": ["a", "b", "c"],
+    "burningProblems": ["a", "b", "c"],
+})
+
+
+def stub_model(prompt: str, usage: dict | None = None) -> str:
+    return STUB_OUTPUT
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pdfs", nargs="+")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--prompt", default="v8", choices=sorted(PROMPTS))
+    parser.add_argument("--model", default="stub", choices=["stub", "nova-micro", "nova-pro"])
+    args = parser.parse_args()
+
+    model = {
+        "stub": stub_model,
+        "nova-micro": NovaClient(NOVA_MICRO_ARN),
+        "nova-pro": NovaClient(NOVA_PRO_ARN),
+    }[args.model]
+    pipeline = Pipeline(
+        extractor=extract_deck,
+        packer=single_pass,
+        prompt=PROMPTS[args.prompt],
+        model=model,
+        parser=parse_json,
+        validator=validate,
+        hooks=[TimingHook()],
+    )
+
+    for path in args.pdfs:
+        samples = {stage: [] for stage in STAGES}
+        for _ in range(args.runs):
+            run = pipeline.run("Benchmark founder notes", path)
+            for stage in STAGES:
+                samples[stage].append(run.timings.get(stage, 0.0) * 1000)
+
+        print(f"{path}  ({len(run.deck.slides)} slides, prompt {len(run.prompt)} chars, {args.runs} runs)")
+        for stage in STAGES:
+            values = samples[stage]
+            print(f"  {stage:9} median {statistics.median(values):9.2f} ms   p95 {percentile(values, 95):9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
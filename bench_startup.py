@@ -0,0 +1,178 @@
+"""Startup benchmark for every entry point.
+
+    python bench_startup.py [--runs 5] [--replay-dir cassettes]
+
+For the FastAPI apps this reports `python -X importtime` totals (with the
+heaviest top-level imports) and the wall time from interpreter launch to the
+first served POST /idea-capture of input.pdf. The app's lifespan runs first,
+so warm-up and the deferred imports are part of the measurement. Bedrock is
+replayed from BEDROCK_REPLAY_DIR (--replay-dir), or from a one-answer
+cassette written to a temp dir, with no replay delays. The Streamlit apps are
+timed to the end of their first script run through streamlit.testing when
+Streamlit is installed.
+"""
+import argparse
+import base64
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+FASTAPI_APPS = ["main", "main1", "main2"]
+STREAMLIT_APPS = ["app.py", "Ai_app.py"]
+DECK_PATH = "input.pdf"
+
+# A valid analysis for every prompt, served when no replay dir is given
+BENCH_ANSWER = {
+    "title": "Bench", "description": "Startup benchmark answer", "audience": "Enterprises",
+    "problemStatements": ["a", "b", "c"], "tags": ["AI"], "followUpQuestions": ["a", "b", "c"],
+    "burningProblems": ["a", "b", "c"],
+}
+
+FIRST_RESPONSE = """
+import asyncio, importlib
+mod = importlib.import_module({module!r})
+
+BOUNDARY = b"bench-boundary"
+with open({deck!r}, "rb") as f:
+    deck = f.read()
+BODY = (
+    b"--" + BOUNDARY + b'\\r\\nContent-Disposition: form-data; name="typed_input"\\r\\n\\r\\nstartup bench\\r\\n'
+    + b"--" + BOUNDARY + b'\\r\\nContent-Disposition: form-data; name="file"; filename="deck.pdf"\\r\\n'
+    + b"Content-Type: application/pdf\\r\\n\\r\\n" + deck + b"\\r\\n--" + BOUNDARY + b"--\\r\\n"
+)
+
+async def lifespan(events, started):
+    async def receive():
+        return await events.get()
+
+    async def send(message):
+        assert message["type"].endswith(".complete"), message
+        if message["type"] == "lifespan.startup.complete":
+            started.set()
+
+    await mod.app({{"type": "lifespan", "asgi": {{"version": "3.0"}}, "state": {{}}}}, receive, send)
+
+async def call():
+    events, started = asyncio.Queue(), asyncio.Event()
+    lifespan_task = asyncio.create_task(lifespan(events, started))
+    await events.put({{"type": "lifespan.startup"}})
+    await started.wait()
+    sent = []
+    body = [{{"type": "http.request", "body": BODY, "more_body": False}}]
+
+    async def receive():
+        if body:
+            return body.pop()
+        await asyncio.Event().wait()
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {{
+        "type": "http", "asgi": {{"version": "3.0"}}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": "/idea-capture", "raw_path": b"/idea-capture",
+        "root_path": "", "query_string": b"", "state": {{}},
+        "headers": [
+            (b"content-type", b"multipart/form-data; boundary=" + BOUNDARY),
+            (b"content-length", str(len(BODY)).encode()),
+            (b"cache-control", b"no-cache"),
+        ],
+        "server": ("bench", 80), "client": ("bench", 1),
+    }}
+    await mod.app(scope, receive, send)
+    assert sent[0]["status"] == 200, (sent[0], b"".join(m.get("body", b"") for m in sent[1:]))
+    await events.put({{"type": "lifespan.shutdown"}})
+    await lifespan_task
+
+asyncio.run(call())
+"""
+
+STREAMLIT_RUN = """
+from streamlit.testing.v1 import AppTest
+AppTest.from_file({path!r}).run(timeout=60)
+"""
+
+
+def run_python(args, env):
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, *args], capture_output=True, text=True, env=env)
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "failed")
+    return elapsed, proc.stderr
+
+
+def write_cassette(directory: str):
+    """One recorded stream answering BENCH_ANSWER, replayed for every model call"""
+    event = {"contentBlockDelta": {"delta": {"text": json.dumps(BENCH_ANSWER)}}}
+    chunk = base64.b64encode(json.dumps(event).encode("utf-8")).decode("ascii")
+    with open(os.path.join(directory, "bench.json"), "w", encoding="utf-8") as f:
+        json.dump({"model_id": "bench", "opened": 0.0, "closed_early": False, "events": [[0.0, {"chunk": chunk}]]}, f)
+
+
+def parse_importtime(stderr: str, module: str):
+    """Cumulative import time of the module and its heaviest direct imports, in ms"""
+    total = 0.0
+    children = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        ms = int(cumulative) / 1000
+        if depth == 0 and name.strip() == module:
+            total = ms
+        elif depth == 1:
+            children.append((ms, name.strip()))
+    return total, sorted(children, reverse=True)[:5]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--replay-dir", default=os.environ.get("BEDROCK_REPLAY_DIR"),
+                        help="recorded Bedrock streams (default: a generated one-answer cassette)")
+    args = parser.parse_args()
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    workdir = tempfile.mkdtemp()
+    replay_dir = args.replay_dir
+    if not replay_dir:
+        replay_dir = os.path.join(workdir, "cassettes")
+        os.makedirs(replay_dir)
+        write_cassette(replay_dir)
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1", BEDROCK_REPLAY_DIR=replay_dir, BEDROCK_REPLAY_SPEED="0")
+    env["ANALYSIS_DB"] = os.path.join(workdir, "bench.db")
+    os.chdir(here)
+
+    for module in FASTAPI_APPS:
+        try:
+            imports = []
+            for _ in range(args.runs):
+                _, stderr = run_python(["-X", "importtime", "-c", f"import {module}"], env)
+                imports.append(parse_importtime(stderr, module))
+            script = FIRST_RESPONSE.format(module=module, deck=DECK_PATH)
+            first = [run_python(["-c", script], env)[0] for _ in range(args.runs)]
+        except RuntimeError as e:
+            print(f"{module:10} skipped: {e}")
+            continue
+        total = statistics.median(total for total, _ in imports)
+        print(f"{module:10} import {total:7.1f} ms   first response {statistics.median(first) * 1000:7.1f} ms")
+        for ms, name in imports[0][1]:
+            print(f"{'':13}{ms:7.1f} ms  {name}")
+
+    for path in STREAMLIT_APPS:
+        try:
+            first = [run_python(["-c", STREAMLIT_RUN.format(path=path)], env)[0] for _ in range(args.runs)]
+        except RuntimeError as e:
+            print(f"{path:10} skipped: {e}")
+            continue
+        print(f"{path:10} first script run {statistics.median(first) * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
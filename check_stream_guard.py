@@ -0,0 +1,76 @@
+"""Offline check of the streamed-output guard against the validator.
+
+    python check_stream_guard.py
+
+Each case is served through BEDROCK_REPLAY_DIR as a recorded stream of small
+deltas and run through NovaClient, parse_json and validate, exactly as an
+entry point would. Answers the validator accepts (extra keys, a code fence)
+must come through untouched; output that can no longer parse (mismatched
+brackets, prose, a repetition loop) must be aborted. Exits 1 on a mismatch.
+"""
+import base64
+import json
+import os
+import sys
+import tempfile
+
+ANSWER = {
+    "title": "NeuroSpark", "description": "Cognitive workflow automation", "audience": "Enterprise CIOs",
+    "problemStatements": ["a", "b", "c"], "tags": ["AI"], "followUpQuestions": ["a", "b", "c"],
+    "burningProblems": ["a", "b", "c"],
+}
+MODEL_ID = "check-stream-guard"
+DELTA_CHARS = 16
+
+# name -> (model output, should the guard abort it)
+CASES = {
+    "plain answer": (json.dumps(ANSWER), False),
+    "extra key": (json.dumps({**ANSWER, "keyMetrics": {"arr": "$1.2M", "pilots": [3, 5]}}), False),
+    "code fence": ("```json\n" + json.dumps(ANSWER, indent=2) + "\n```", False),
+    "mismatched brackets": ('{"title": "T", "tags": ["AI"}, "audience": "x"}', True),
+    "prose": ("I'd be happy to analyse this deck. " * 6 + json.dumps(ANSWER), True),
+    "repetition loop": ('{"title": "' + "growth growth growth " * 80, True),
+}
+
+
+def write_cassette(directory: str, prompt: str, output: str):
+    from bedrock_replay import request_key
+
+    body = json.dumps({"messages": [{"role": "user", "content": [{"text": prompt}]}]})
+    events = []
+    for i in range(0, len(output), DELTA_CHARS):
+        event = {"contentBlockDelta": {"delta": {"text": output[i:i + DELTA_CHARS]}}}
+        events.append([0.0, {"chunk": base64.b64encode(json.dumps(event).encode("utf-8")).decode("ascii")}])
+    path = os.path.join(directory, request_key(MODEL_ID, body) + ".json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"model_id": MODEL_ID, "opened": 0.0, "closed_early": False, "events": events}, f)
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    for name, (output, _) in CASES.items():
+        write_cassette(directory, name, output)
+    os.environ["BEDROCK_REPLAY_DIR"] = directory
+    os.environ["BEDROCK_REPLAY_SPEED"] = "0"
+
+    from pipeline import NovaClient, parse_json, validate
+
+    client = NovaClient(MODEL_ID)
+    failures = 0
+    for name, (_, should_abort) in CASES.items():
+        usage = {}
+        raw = client(name, usage=usage)
+        aborted = usage.get("aborted", [])
+        result, errors = validate(parse_json(raw))
+        if should_abort:
+            ok = len(aborted) == client.retries + 1
+        else:
+            ok = not aborted and not errors and all(result.get(key) == value for key, value in ANSWER.items())
+        failures += not ok
+        detail = ", ".join(aborted) if aborted else (", ".join(errors) or "valid")
+        print(f"{'ok' if ok else 'FAIL':5} {name:20} {detail}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import os
+import threading
+from contextlib import asynccontextmanager
+
+# Heavy SDKs are imported on first use so uvicorn workers and Streamlit
+# reruns don't pay for boto3/pdfminer before they need them
+_lock = threading.Lock()
+_bedrock_clients = {}
+_warm_up_started = False
+
+
+def bedrock_runtime(region_name="ap-south-1"):
+    client = _bedrock_clients.get(region_name)
+    if client is None:
+        with _lock:
+            client = _bedrock_clients.get(region_name)
+            if client is None:
+                client = _build_bedrock_runtime(region_name)
+                _bedrock_clients[region_name] = client
+    return client
+
+
+def _build_bedrock_runtime(region_name):
+    # Load testing: BEDROCK_RECORD_DIR records every response stream,
+    # BEDROCK_REPLAY_DIR serves recorded ones without touching AWS
+    replay_dir = os.environ.get("BEDROCK_REPLAY_DIR")
+    if replay_dir:
+        from bedrock_replay import ReplayClient
+        return ReplayClient.from_env(replay_dir)
+
+    import boto3
+    client = boto3.client("bedrock-runtime", region_name=region_name)
+    record_dir = os.environ.get("BEDROCK_RECORD_DIR")
+    if record_dir:
+        from bedrock_replay import RecordingClient
+        client = RecordingClient(client, record_dir)
+    return client
+
+
+def _warm():
+    import pdfplumber  # noqa: F401  (pulls in pdfminer)
+    bedrock_runtime()
+
+
+def warm_up():
+    """Load pdfplumber and build the Bedrock client on a background thread, once per process"""
+    global _warm_up_started
+    with _lock:
+        if _warm_up_started:
+            return
+        _warm_up_started = True
+    threading.Thread(target=_warm, name="warm-up", daemon=True).start()
+
+
+@asynccontextmanager
+async def warm_up_lifespan(app):
+    warm_up()
+    yield
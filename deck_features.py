@@ -0,0 +1,224 @@
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+
+from deck_structure import Deck
+
+# Seed vocabularies: phrase -> label. Tags and audience segments from past
+# analyses are added on top by FeatureIndex.from_store().
+TAG_TERMS = {
+    "ai": "AI", "artificial intelligence": "AI", "machine learning": "Machine Learning", "ml": "Machine Learning",
+    "llm": "LLM", "generative ai": "Generative AI", "nlp": "NLP", "computer vision": "Computer Vision",
+    "rag": "RAG", "automation": "Automation", "workflow automation": "Workflow Automation",
+    "saas": "SaaS", "b2b": "B2B", "b2c": "B2C", "marketplace": "Marketplace", "api": "API",
+    "cloud": "Cloud", "analytics": "Analytics", "data platform": "Data Platform", "iot": "IoT",
+    "blockchain": "Blockchain", "cybersecurity": "Cybersecurity", "security": "Security",
+    "fintech": "Fintech", "payments": "Payments", "lending": "Lending", "insurtech": "Insurtech",
+    "healthcare": "Healthcare", "healthtech": "Healthtech", "medtech": "Medtech", "telemedicine": "Telemedicine",
+    "edtech": "Edtech", "logistics": "Logistics", "supply chain": "Supply Chain", "e-commerce": "E-commerce",
+    "ecommerce": "E-commerce", "retail": "Retail", "proptech": "Proptech", "agritech": "Agritech",
+    "climate": "Climate", "cleantech": "Cleantech", "energy": "Energy", "mobility": "Mobility",
+    "hr tech": "HR Tech", "legal tech": "Legal Tech", "compliance": "Compliance", "kyc": "KYC",
+    "regtech": "Regtech", "gaming": "Gaming", "media": "Media", "robotics": "Robotics",
+    "subscription": "Subscription", "enterprise software": "Enterprise Software",
+}
+AUDIENCE_TERMS = {
+    "enterprises": "Enterprises", "enterprise": "Enterprises", "smbs": "SMBs", "smb": "SMBs",
+    "small businesses": "Small businesses", "startups": "Startups", "developers": "Developers",
+    "engineers": "Engineers", "data scientists": "Data scientists", "product managers": "Product managers",
+    "cio": "CIOs", "cios": "CIOs", "cto": "CTOs", "ctos": "CTOs", "cfo": "CFOs", "cfos": "CFOs",
+    "operations teams": "Operations teams", "operations leaders": "Operations leaders",
+    "hospitals": "Hospitals", "clinics": "Clinics", "healthcare providers": "Healthcare providers",
+    "care providers": "Healthcare providers", "health systems": "Health systems",
+    "patients": "Patients", "doctors": "Doctors", "insurers": "Insurers", "banks": "Banks",
+    "lenders": "Lenders", "retailers": "Retailers", "merchants": "Merchants", "brands": "Brands",
+    "consumers": "Consumers", "students": "Students", "teachers": "Teachers", "schools": "Schools",
+    "universities": "Universities", "fleet operators": "Fleet operators", "shippers": "Shippers",
+    "manufacturers": "Manufacturers", "farmers": "Farmers", "investors": "Investors",
+    "compliance teams": "Compliance teams", "hr teams": "HR teams", "sales teams": "Sales teams",
+    "marketing teams": "Marketing teams", "government": "Government agencies",
+}
+
+MAX_TAGS = 8
+MAX_AUDIENCE = 5
+MAX_KEYWORDS = 10
+MAX_METRICS = 10
+MIN_LEARNED_COUNT = 2
+# Deck hashes remembered for de-duplication without a store (least recent dropped first)
+MAX_SEEN_DECKS = 10_000
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[+&'-][a-z0-9]+)*")
+_STOPWORDS = frozenset("""
+a about across after all also an and any are as at be been being both but by can could did do does
+each for from has have how if in into is it its more most much no not of on or our out over per so
+such than that the their them then there these they this those through to under up us very via was
+we were what when where which while who will with within would you your page slide
+""".split())
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+# === Phrase Index ===
+class PhraseTrie:
+    """Token-level trie over phrases; scanning takes the longest phrase at each position"""
+
+    _LABEL = object()
+
+    def __init__(self, phrases: dict | None = None):
+        self.root = {}
+        self.max_len = 0
+        for phrase, label in (phrases or {}).items():
+            self.add(phrase, label)
+
+    def add(self, phrase: str, label: str):
+        tokens = tokenize(phrase)
+        if not tokens:
+            return
+        node = self.root
+        for token in tokens:
+            node = node.setdefault(token, {})
+        node.setdefault(self._LABEL, label)
+        self.max_len = max(self.max_len, len(tokens))
+
+    def find(self, tokens: list[str]) -> list[str]:
+        """Labels of every non-overlapping match, in document order"""
+        labels = []
+        i = 0
+        while i < len(tokens):
+            node = self.root
+            match = None
+            for j in range(i, min(len(tokens), i + self.max_len)):
+                node = node.get(tokens[j])
+                if node is None:
+                    break
+                if self._LABEL in node:
+                    match = (node[self._LABEL], j + 1)
+            if match is None:
+                i += 1
+            else:
+                labels.append(match[0])
+                i = match[1]
+        return labels
+
+
+def _ranked(labels: list[str], limit: int) -> list[str]:
+    """Most frequent first, ties broken by first occurrence"""
+    counts = Counter(labels)
+    first = {}
+    for i, label in enumerate(labels):
+        first.setdefault(label, i)
+    return sorted(counts, key=lambda label: (-counts[label], first[label]))[:limit]
+
+
+def deck_terms(tokens: list[str]) -> list[str]:
+    """Unigrams and bigrams that can be keywords: no stopwords, no bare numbers"""
+    words = [t if len(t) > 2 and not t.isdigit() and t not in _STOPWORDS else None for t in tokens]
+    terms = [w for w in words if w]
+    terms.extend(f"{a} {b}" for a, b in zip(words, words[1:]) if a and b)
+    return terms
+
+
+# === Feature Index ===
+class FeatureIndex:
+    """Instant tag/audience/keyword/metric candidates for a deck, merged into the LLM answer later.
+
+    Built once at startup. Keywords are TF-IDF against every deck seen so far;
+    with a store the document frequencies live there and are looked up per
+    deck, so they survive restarts without being loaded up front.
+    """
+
+    def __init__(self, tag_terms: dict | None = None, audience_terms: dict | None = None, store=None):
+        self.tags = PhraseTrie(TAG_TERMS if tag_terms is None else tag_terms)
+        self.audience = PhraseTrie(AUDIENCE_TERMS if audience_terms is None else audience_terms)
+        self.store = store
+        # Document frequencies without a store
+        self.df = Counter()
+        self.documents = 0
+        self.seen = OrderedDict()
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_store(cls, store) -> "FeatureIndex":
+        tags, audience = store.vocabulary(MIN_LEARNED_COUNT)
+        index = cls(store=store)
+        # Labels keep the casing the model used, e.g. "AI-powered Automation"
+        for tag in tags:
+            index.tags.add(tag, tag.title() if tag.islower() else tag)
+        for segment in audience:
+            index.audience.add(segment, segment[:1].upper() + segment[1:])
+        return index
+
+    def __call__(self, deck: Deck, typed_input: str = "", deck_hash: str = "") -> dict:
+        tokens = tokenize(typed_input + "\n" + deck.text)
+        counts = Counter(deck_terms(tokenize(deck.text)))
+        if deck_hash:
+            self.observe(deck_hash, set(counts))
+
+        documents, df = self.document_frequencies(counts)
+        idf = {term: math.log((1 + documents) / (1 + df.get(term, 0))) + 1 for term in counts}
+        total = sum(counts.values()) or 1
+        scored = sorted(counts, key=lambda term: -counts[term] / total * idf[term])
+        keywords = []
+        for term in scored:
+            if len(keywords) == MAX_KEYWORDS:
+                break
+            if not any(term in chosen.split() for chosen in keywords):
+                keywords.append(term)
+
+        metrics = []
+        for slide in deck.slides:
+            for metric in slide.metrics:
+                if metric.text not in metrics:
+                    metrics.append(metric.text)
+
+        return {
+            "tags": _ranked(self.tags.find(tokens), MAX_TAGS),
+            "audience": ", ".join(_ranked(self.audience.find(tokens), MAX_AUDIENCE)),
+            "keywords": keywords,
+            "metrics": metrics[:MAX_METRICS],
+        }
+
+    def document_frequencies(self, terms) -> tuple[int, dict]:
+        if self.store is not None:
+            return self.store.document_frequencies(terms)
+        with self.lock:
+            return self.documents, {term: self.df[term] for term in terms if term in self.df}
+
+    def observe(self, deck_hash: str, terms: set[str]):
+        """Count a deck once towards the document frequencies"""
+        if self.store is not None:
+            # The store counts each deck once across workers and restarts
+            self.store.save_deck_terms(deck_hash, terms)
+            return
+        with self.lock:
+            if deck_hash in self.seen:
+                self.seen.move_to_end(deck_hash)
+                return
+            self.seen[deck_hash] = None
+            if len(self.seen) > MAX_SEEN_DECKS:
+                self.seen.popitem(last=False)
+            self.documents += 1
+            self.df.update(terms)
+
+    @staticmethod
+    def merge(result: dict, features: dict) -> dict:
+        """LLM tags/audience first, then local candidates the model did not mention"""
+        merged = dict(result)
+        tags = list(result.get("tags") or []) if isinstance(result.get("tags"), list) else []
+        known = {str(tag).lower() for tag in tags}
+        for tag in features.get("tags", []):
+            if tag.lower() not in known and len(tags) < MAX_TAGS + 2:
+                tags.append(tag)
+                known.add(tag.lower())
+        merged["tags"] = tags
+
+        audience = str(result.get("audience") or "")
+        missing = [
+            segment for segment in features.get("audience", "").split(", ")
+            if segment and segment.lower() not in audience.lower()
+        ]
+        merged["audience"] = ", ".join(part for part in [audience.strip(" ,"), *missing] if part)
+        return merged
@@ -0,0 +1,246 @@
+import re
+from dataclasses import asdict, dataclass, field
+from operator import itemgetter
+
+# Words at or above this size, or set in a bold face, count as highlights
+HIGHLIGHT_MIN_SIZE = 16
+LINE_TOLERANCE = 3
+# pdfplumber's extract_words defaults: a gap wider than this starts a new word
+WORD_X_TOLERANCE = 3
+WORD_Y_TOLERANCE = 3
+BULLET_CHARS = "•●○◦▪■-–*"
+
+_METRIC_RE = re.compile(
+    r"(?P<currency>[$€£₹])?(?P<value>\d[\d,]*(?:\.\d+)?)\s?"
+    r"(?P<unit>%|x\b|[kKmMbB]\b|mn\b|bn\b|million\b|billion\b|thousand\b|crore\b|cr\b|lakh\b"
+    r"|users\b|customers\b|clients\b|months\b|years\b|weeks\b|days\b|hours\b)?",
+    re.IGNORECASE,
+)
+
+
+# === Compact Deck Representation ===
+@dataclass(slots=True)
+class Metric:
+    value: float
+    unit: str
+    text: str
+
+
+@dataclass(slots=True)
+class Slide:
+    number: int
+    title: str = ""
+    bullets: list[str] = field(default_factory=list)
+    metrics: list[Metric] = field(default_factory=list)
+    highlights: list[str] = field(default_factory=list)
+
+    def to_compact(self) -> str:
+        # Bullets are plain lines; fully emphasised ones start with "*" and other
+        # highlights are wrapped in "*...*" where they occur. Only figures and
+        # highlights not already in the text get "metrics:" / "key:" lines, so the
+        # block stays smaller than the slide's raw text
+        emphasised = set(self.highlights)
+        bullets = list(self.bullets)
+        marked = [bullet in emphasised for bullet in bullets]
+        spans = []
+        for span in self.highlights:
+            if span in emphasised.intersection(self.bullets):
+                continue
+            for i, bullet in enumerate(bullets):
+                if not marked[i] and span in bullet:
+                    bullets[i] = bullet.replace(span, f"*{span}*", 1)
+                    break
+            else:
+                if span not in self.title:
+                    spans.append(span)
+
+        lines = [f"[S{self.number}] {self.title}"]
+        lines.extend("*" + bullet if emphasised else bullet for bullet, emphasised in zip(bullets, marked))
+        text = "\n".join([self.title, *self.bullets])
+        figures = [m.text for m in self.metrics if m.text not in text]
+        if figures:
+            lines.append("metrics: " + "; ".join(figures))
+        if spans:
+            lines.append("key: " + " | ".join(spans))
+        return "\n".join(lines)
+
+
+@dataclass(slots=True)
+class Deck:
+    slides: list[Slide] = field(default_factory=list)
+
+    @property
+    def text(self) -> str:
+        """Plain text of the deck, one line per title/bullet"""
+        return "\n".join(
+            "\n".join([slide.title, *slide.bullets]) for slide in self.slides
+        )
+
+    def to_compact(self, max_len: int = 4000) -> str:
+        """Render slides for the prompt, dropping whole slides past max_len"""
+        blocks = []
+        used = 0
+        for slide in self.slides:
+            block = slide.to_compact()
+            if blocks and used + len(block) + 1 > max_len:
+                break
+            blocks.append(block[:max_len])
+            used += len(block) + 1
+        return "\n".join(blocks)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Deck":
+        slides = []
+        for raw in data.get("slides", []):
+            metrics = [Metric(**m) for m in raw.get("metrics", [])]
+            slides.append(Slide(
+                number=raw["number"],
+                title=raw.get("title", ""),
+                bullets=list(raw.get("bullets", [])),
+                metrics=metrics,
+                highlights=list(raw.get("highlights", [])),
+            ))
+        return cls(slides=slides)
+
+
+# === Segmentation ===
+@dataclass(slots=True)
+class PageLines:
+    """One page's text lines with per-line font stats and its highlight spans in order"""
+    texts: list[str] = field(default_factory=list)
+    sizes: list[float] = field(default_factory=list)
+    emphasised: list[bool] = field(default_factory=list)
+    spans: list[str] = field(default_factory=list)
+
+
+def _column(chars: list[dict], key: str, np):
+    return np.fromiter(map(itemgetter(key), chars), dtype=float, count=len(chars))
+
+
+def segment_page(chars: list[dict]) -> PageLines:
+    """Split a page's chars (pdfplumber, stream order) into words, lines and highlight spans.
+
+    Word breaks follow extract_words(use_text_flow=True, extra_attrs=["size",
+    "fontname"]): blanks, gaps and jumps between characters, and any size or
+    font change. All per-character tests are numpy array operations, so the
+    page is walked once with no Python loop over words.
+    """
+    import numpy as np
+
+    page = PageLines()
+    texts = list(map(itemgetter("text"), chars))
+    blank = np.fromiter(map(str.isspace, texts), dtype=bool, count=len(texts))
+    kept = np.flatnonzero(~blank)
+    if not kept.size:
+        return page
+
+    fontnames = list(map(itemgetter("fontname"), chars))
+    font_index = {name: i for i, name in enumerate(dict.fromkeys(fontnames))}
+    bold_fonts = np.array(["bold" in name.lower() for name in font_index])
+    font_ids = np.fromiter(map(font_index.__getitem__, fontnames), dtype=np.intp, count=len(fontnames))[kept]
+
+    text = np.array(texts, dtype=object)[kept]
+    after_blank = np.concatenate(([False], blank[:-1]))[kept]
+    x0 = _column(chars, "x0", np)[kept]
+    x1 = _column(chars, "x1", np)[kept]
+    top = _column(chars, "top", np)[kept]
+    size = _column(chars, "size", np)[kept]
+    highlight = (size >= HIGHLIGHT_MIN_SIZE) | bold_fonts[font_ids]
+
+    dy = np.abs(np.diff(top))
+    new_word = np.ones(len(text), dtype=bool)
+    new_word[1:] = (
+        after_blank[1:]
+        | (x0[1:] < x0[:-1])
+        | (x0[1:] > x1[:-1] + WORD_X_TOLERANCE)
+        | (dy > WORD_Y_TOLERANCE)
+        | (size[1:] != size[:-1])
+        | (font_ids[1:] != font_ids[:-1])
+    )
+    new_line = np.ones(len(text), dtype=bool)
+    new_line[1:] = new_word[1:] & (dy > LINE_TOLERANCE)
+
+    # Rebuild text with separators: "\n" before each line, " " between words
+    separators = np.array(["", " ", "\n"], dtype=object)
+    separator = separators[new_word.astype(np.intp) + new_line]
+    page.texts = [line.strip() for line in "".join((separator + text).tolist()).split("\n")[1:]]
+    line_starts = np.flatnonzero(new_line)
+    page.sizes = np.maximum.reduceat(size, line_starts).tolist()
+    page.emphasised = np.logical_and.reduceat(highlight, line_starts).tolist()
+
+    # Spans are runs of highlighted words within a line
+    prev_highlight = np.concatenate(([False], highlight[:-1]))
+    span_start = highlight & (new_line | ~prev_highlight)
+    next_line = np.concatenate((new_line[1:], [True]))
+    next_highlight = np.concatenate((highlight[1:], [False]))
+    span_end = highlight & (next_line | ~next_highlight)
+    followed_by_plain = (~next_line & ~next_highlight)[span_end]
+
+    span_separator = separators[np.where(span_start, 2, new_word.astype(np.intp))][highlight]
+    span_texts = "".join((span_separator + text[highlight]).tolist()).split("\n")[1:]
+    for span, plain_after in zip(span_texts, followed_by_plain.tolist()):
+        # A bold "Label:" followed by plain text is a field name, not a highlight
+        if not (plain_after and span.endswith(":")):
+            page.spans.append(span)
+    return page
+
+
+def extract_metrics(text: str) -> list[Metric]:
+    metrics = []
+    for match in _METRIC_RE.finditer(text):
+        currency = match.group("currency") or ""
+        unit = match.group("unit") or ""
+        if not currency and not unit:
+            continue
+        try:
+            value = float(match.group("value").replace(",", ""))
+        except ValueError:
+            continue
+        metrics.append(Metric(value=value, unit=currency + unit, text=match.group(0).strip()))
+    return metrics
+
+
+def build_slide(number: int, page: PageLines) -> Slide:
+    slide = Slide(number=number)
+    if not page.texts:
+        return slide
+
+    # Title is the largest-font line; on a tie prefer the first fully emphasised one
+    sizes = [round(size) for size in page.sizes]
+    largest = max(sizes)
+    candidates = [i for i, size in enumerate(sizes) if size == largest]
+    title_index = next((i for i in candidates if page.emphasised[i]), candidates[0])
+    slide.title = page.texts[title_index]
+
+    for i, text in enumerate(page.texts):
+        if i != title_index:
+            text = text.lstrip(BULLET_CHARS).strip()
+            if text and text[0].islower() and slide.bullets:
+                # Wrapped continuation of the previous line
+                slide.bullets[-1] += " " + text
+            elif text:
+                slide.bullets.append(text)
+        slide.metrics.extend(extract_metrics(text))
+
+    # Highlights stay in document order, deduplicated
+    seen = {slide.title}
+    for span in page.spans:
+        if span not in seen:
+            seen.add(span)
+            slide.highlights.append(span)
+    return slide
+
+
+def extract_deck(file_path) -> Deck:
+    """file_path may also be a seekable binary file object"""
+    import pdfplumber
+
+    deck = Deck()
+    with pdfplumber.open(file_path) as pdf:
+        for number, page in enumerate(pdf.pages, 1):
+            # page.chars runs pdfminer's layout analysis once; everything else is derived from it
+            deck.slides.append(build_slide(number, segment_page(page.chars)))
+    return deck
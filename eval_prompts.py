@@ -0,0 +1,213 @@
+"""Offline evaluation of prompt versions: answer quality against token cost and latency.
+
+    python eval_prompts.py deck.pdf [more.pdf ...] [--prompts analyst-v1,v8] [--model replay|nova-micro|nova-pro]
+        [--recordings eval_recordings] [--notes "founder notes"] [--json report.json]
+
+Every deck is run through each prompt version. With a Nova model the live
+response is scored and recorded under --recordings, keyed by the prompt text;
+--model replay (the default) plays those recordings back through a local stub,
+so re-scoring a fixed corpus is free and deterministic. A prompt whose text
+changed has no recording and is reported as missing until it is recorded.
+
+Scores are 0-1 per response:
+  schema       share of SCHEMA fields present with the right type
+  cardinality  share of the three-item fields with exactly 3 entries
+  grounding    share of distinct content words in the answer that occur in the deck or notes
+quality is their mean. Per prompt version the report gives the mean scores,
+mean input/output tokens (estimated from text length when the model reported
+none, e.g. a JSON stream closed at its end; such rows have estimated_tokens set
+in --json), median model latency and quality per 1k tokens.
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import statistics
+import time
+
+from deck_structure import extract_deck
+from pipeline import (
+    NOVA_MICRO_ARN, NOVA_PRO_ARN, PROMPTS, NovaClient, Pipeline, PipelineRun, TimingHook,
+    parse_json, parse_strict_json, single_pass, validate,
+)
+from pipeline.models import CHARS_PER_TOKEN
+from pipeline.validator import SCHEMA, THREE_ITEM_FIELDS
+
+DEFAULT_NOTES = "Founder notes: early-stage B2B startup looking for feedback on the pitch."
+WORD_RE = re.compile(r"[a-z0-9][a-z0-9+\-]{3,}")
+STOPWORDS = frozenset("""
+about after also been being between both could does during each from have into like more most
+must only other over same should some such than that their them then there these they this
+those through under very what when where which while will with within would your
+""".split())
+
+
+# === Recorded Responses ===
+class MissingRecording(Exception):
+    pass
+
+
+class Recordings:
+    """Model responses on disk, one JSON file per prompt text"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def path(self, prompt: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(prompt.encode("utf-8")).hexdigest() + ".json")
+
+    def replay(self, prompt: str, usage: dict | None = None) -> str:
+        try:
+            with open(self.path(prompt), encoding="utf-8") as f:
+                recording = json.load(f)
+        except FileNotFoundError:
+            raise MissingRecording(prompt[:80]) from None
+        if usage is not None:
+            usage.update(recording["usage"])
+            usage["seconds"] = recording["seconds"]
+        return recording["output"]
+
+    def recording(self, model, model_id: str):
+        """Wrap a live model client so every response is saved for replay"""
+
+        def call(prompt: str, usage: dict | None = None) -> str:
+            usage = {} if usage is None else usage
+            start = time.perf_counter()
+            output = model(prompt, usage)
+            usage["seconds"] = time.perf_counter() - start
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self.path(prompt), "w", encoding="utf-8") as f:
+                json.dump({
+                    "model": model_id,
+                    "output": output,
+                    "usage": {k: v for k, v in usage.items() if k != "seconds"},
+                    "seconds": usage["seconds"],
+                }, f)
+            return output
+
+        return call
+
+
+# === Scoring ===
+def content_words(text: str) -> set[str]:
+    return {word for word in WORD_RE.findall(text.lower()) if word not in STOPWORDS}
+
+
+def answer_text(parsed: dict) -> str:
+    parts = []
+    for key in SCHEMA:
+        value = parsed.get(key)
+        if isinstance(value, list):
+            parts.extend(str(item) for item in value)
+        elif value is not None:
+            parts.append(str(value))
+    return "\n".join(parts)
+
+
+def score(raw: str, source_words: set[str]) -> dict:
+    parsed = parse_json(raw)
+    if parsed is None:
+        return {"json": 0.0, "schema": 0.0, "cardinality": 0.0, "grounding": 0.0, "quality": 0.0}
+
+    schema = sum(isinstance(parsed.get(key), kind) for key, kind in SCHEMA.items()) / len(SCHEMA)
+    cardinality = sum(
+        isinstance(parsed.get(key), list) and len(parsed[key]) == 3 for key in THREE_ITEM_FIELDS
+    ) / len(THREE_ITEM_FIELDS)
+    words = content_words(answer_text(parsed))
+    grounding = len(words & source_words) / len(words) if words else 0.0
+    return {
+        "json": float(parse_strict_json(raw) is not None),
+        "schema": schema,
+        "cardinality": cardinality,
+        "grounding": grounding,
+        "quality": (schema + cardinality + grounding) / 3,
+    }
+
+
+def summarise(rows: list[dict]) -> dict:
+    def mean(key):
+        return statistics.fmean(row[key] for row in rows)
+
+    summary = {key: mean(key) for key in ("json", "schema", "cardinality", "grounding", "quality")}
+    summary["input_tokens"] = mean("input_tokens")
+    summary["output_tokens"] = mean("output_tokens")
+    summary["latency_ms"] = statistics.median(row["seconds"] * 1000 for row in rows)
+    tokens = summary["input_tokens"] + summary["output_tokens"]
+    summary["quality_per_1k_tokens"] = summary["quality"] / tokens * 1000 if tokens else 0.0
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pdfs", nargs="+")
+    parser.add_argument("--prompts", default=",".join(sorted(PROMPTS)))
+    parser.add_argument("--model", default="replay", choices=["replay", "nova-micro", "nova-pro"])
+    parser.add_argument("--recordings", default="eval_recordings")
+    parser.add_argument("--notes", default=DEFAULT_NOTES)
+    parser.add_argument("--json", dest="json_path")
+    args = parser.parse_args()
+
+    recordings = Recordings(args.recordings)
+    if args.model == "replay":
+        model = recordings.replay
+    else:
+        model_id = {"nova-micro": NOVA_MICRO_ARN, "nova-pro": NOVA_PRO_ARN}[args.model]
+        model = recordings.recording(NovaClient(model_id), model_id)
+
+    versions = [version.strip() for version in args.prompts.split(",") if version.strip()]
+    pipelines = {
+        version: Pipeline(
+            extractor=extract_deck, packer=single_pass, prompt=PROMPTS[version], model=model,
+            parser=parse_json, validator=validate, hooks=[TimingHook()],
+        )
+        for version in versions
+    }
+
+    decks = []
+    for path in args.pdfs:
+        with open(path, "rb") as f:
+            deck_hash = hashlib.sha256(f.read()).hexdigest()
+        deck = extract_deck(path)
+        decks.append((path, deck_hash, deck, content_words(deck.text + "\n" + args.notes)))
+
+    rows = {version: [] for version in versions}
+    missing = {version: 0 for version in versions}
+    for version, pipeline in pipelines.items():
+        for path, deck_hash, deck, source_words in decks:
+            run = PipelineRun(typed_input=args.notes, file_path=path, deck_hash=deck_hash, deck=deck)
+            try:
+                pipeline.analyse(run)
+            except MissingRecording:
+                missing[version] += 1
+                continue
+            row = score(run.raw_output, source_words)
+            row.update(
+                deck=os.path.basename(path),
+                input_tokens=run.usage.get("inputTokens", -(-len(run.prompt) // CHARS_PER_TOKEN)),
+                output_tokens=run.usage.get("outputTokens", -(-len(run.raw_output) // CHARS_PER_TOKEN)),
+                seconds=run.usage.get("seconds", run.timings.get("model", 0.0)),
+                estimated_tokens=run.usage.get("estimatedTokens", "inputTokens" not in run.usage),
+            )
+            rows[version].append(row)
+
+    print(f"{'prompt':16}{'n':>4}{'miss':>6}{'json':>7}{'schema':>8}{'card':>7}{'ground':>8}{'quality':>9}"
+          f"{'in tok':>9}{'out tok':>9}{'p50 ms':>9}{'q/1k tok':>10}")
+    report = {}
+    for version in versions:
+        if not rows[version]:
+            print(f"{version:16}{0:>4}{missing[version]:>6}")
+            continue
+        s = summarise(rows[version])
+        report[version] = {"summary": s, "missing": missing[version], "rows": rows[version]}
+        print(f"{version:16}{len(rows[version]):>4}{missing[version]:>6}{s['json']:>7.2f}{s['schema']:>8.2f}"
+              f"{s['cardinality']:>7.2f}{s['grounding']:>8.2f}{s['quality']:>9.3f}{s['input_tokens']:>9.0f}"
+              f"{s['output_tokens']:>9.0f}{s['latency_ms']:>9.0f}{s['quality_per_1k_tokens']:>10.3f}")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
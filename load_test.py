@@ -0,0 +1,112 @@
+"""Concurrent load test for POST /idea-capture, meant to run against replayed Bedrock streams.
+
+    # 1. record real streams once (any entry point, normal traffic or a few requests)
+    BEDROCK_RECORD_DIR=cassettes uvicorn main:app
+    # 2. serve them back at original timing (BEDROCK_REPLAY_SPEED=10 for 10x,
+    #    BEDROCK_REPLAY_THROTTLE=0.05 or BEDROCK_REPLAY_MAX_RPS=20 to inject throttling)
+    BEDROCK_REPLAY_DIR=cassettes uvicorn main:app --workers 4
+    python load_test.py deck.pdf [more.pdf ...] --url http://127.0.0.1:8000 --concurrency 32 --requests 500
+
+With --app main the app is imported and driven in-process instead of over
+HTTP (set BEDROCK_REPLAY_DIR in the environment first). Requests carry
+"Cache-Control: no-cache" so every one reaches the model stage; --cached
+sends them without it. The report gives throughput, status counts and
+latency percentiles; --json also writes every request's latency.
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import statistics
+import time
+from collections import Counter
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def run_load(client, decks, args) -> list[tuple[int, float]]:
+    results = []
+    counter = iter(range(args.requests))
+    headers = {} if args.cached else {"Cache-Control": "no-cache"}
+    if args.priority:
+        headers["X-Priority"] = args.priority
+
+    async def worker():
+        for i in counter:
+            name, data = decks[i % len(decks)]
+            start = time.perf_counter()
+            try:
+                response = await client.post(
+                    "/idea-capture",
+                    data={"typed_input": f"Load test request {i}"},
+                    files={"file": (name, data, "application/pdf")},
+                    headers=headers,
+                )
+                status = response.status_code
+            except Exception:
+                status = 0
+            results.append((status, time.perf_counter() - start))
+
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    return results
+
+
+async def main_async(args):
+    import httpx
+
+    decks = []
+    for path in args.pdfs:
+        with open(path, "rb") as f:
+            decks.append((os.path.basename(path), f.read()))
+
+    if args.app:
+        transport = httpx.ASGITransport(app=importlib.import_module(args.app).app)
+        client = httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=args.timeout)
+    else:
+        limits = httpx.Limits(max_connections=args.concurrency)
+        client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits)
+
+    async with client:
+        start = time.perf_counter()
+        results = await run_load(client, decks, args)
+        elapsed = time.perf_counter() - start
+
+    statuses = Counter(status for status, _ in results)
+    ok = [seconds * 1000 for status, seconds in results if status == 200]
+    print(f"{len(results)} requests in {elapsed:.1f} s ({len(results) / elapsed:.1f} req/s), "
+          f"concurrency {args.concurrency}")
+    print("status  " + "  ".join(f"{status or 'error'}: {count}" for status, count in sorted(statuses.items())))
+    if ok:
+        print(f"200 latency ms  p50 {percentile(ok, 50):.0f}  p90 {percentile(ok, 90):.0f}  "
+              f"p99 {percentile(ok, 99):.0f}  max {max(ok):.0f}  mean {statistics.fmean(ok):.0f}")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "seconds": elapsed,
+                "concurrency": args.concurrency,
+                "statuses": {str(status): count for status, count in statuses.items()},
+                "requests": [{"status": status, "ms": seconds * 1000} for status, seconds in results],
+            }, f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pdfs", nargs="+")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--app", help="module to drive in-process instead of --url, e.g. main")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--priority", choices=["interactive", "batch"])
+    parser.add_argument("--cached", action="store_true")
+    parser.add_argument("--json", dest="json_path")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
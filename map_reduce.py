@@ -0,0 +1,219 @@
+import contextvars
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+
+from deck_structure import Deck, Slide
+
+MAP_PROMPT_VERSION = "map-v1"
+MAP_CHUNK_CHARS = 3000
+# Average slides per map chunk; chunks end where a slide's content hash says so
+MAP_CHUNK_SLIDES = 4
+MAP_CONCURRENCY = 4
+# Summaries are re-mapped until they fit the reduce prompt, at most this many rounds
+MAX_MAP_ROUNDS = 4
+
+
+# === Stage Accounting ===
+@dataclass(slots=True)
+class StageStats:
+    calls: int = 0
+    cache_hits: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    seconds: float = 0.0
+    # Pseudo-slides the reduce prompt still had to drop after the last round
+    dropped: int = 0
+
+
+# === Map-Stage Cache ===
+class MapCache:
+    """Chunk summaries keyed by content hash, optionally persisted as JSON"""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.entries = {}
+        self.lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    @staticmethod
+    def key(model_id: str, chunk_text: str) -> str:
+        raw = f"{MAP_PROMPT_VERSION}\0{model_id}\0{chunk_text}".encode("utf-8")
+        return hashlib.sha256(raw).hexdigest()
+
+    def get(self, key: str):
+        with self.lock:
+            return self.entries.get(key)
+
+    def put(self, key: str, summary: str):
+        with self.lock:
+            self.entries[key] = summary
+
+    def save(self):
+        if not self.path:
+            return
+        with self.lock:
+            data = json.dumps(self.entries)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
+
+
+# === Chunking ===
+def exceeds_budget(deck: Deck, max_len: int = 4000) -> bool:
+    """True when a single-pass prompt would have to drop slides"""
+    return sum(len(slide.to_compact()) + 1 for slide in deck.slides) > max_len
+
+
+def dropped_slides(deck: Deck, max_len: int = 4000) -> int:
+    """How many trailing slides Deck.to_compact(max_len) leaves out"""
+    used = 0
+    for kept, slide in enumerate(deck.slides):
+        size = len(slide.to_compact()) + 1
+        if kept and used + size > max_len:
+            return len(deck.slides) - kept
+        used += size
+    return 0
+
+
+def ends_chunk(slide: Slide, every: int = MAP_CHUNK_SLIDES) -> bool:
+    """Content-defined boundary: depends only on the slide's own text"""
+    raw = "\0".join([slide.title, *slide.bullets]).encode("utf-8")
+    return int.from_bytes(hashlib.sha256(raw).digest()[:4], "big") % every == 0
+
+
+def chunk_slides(deck: Deck, max_chars: int = MAP_CHUNK_CHARS,
+                 every: int = MAP_CHUNK_SLIDES) -> list[list[Slide]]:
+    """Split at content-defined boundaries so editing a slide only changes its own chunk.
+
+    A chunk is also cut before it passes max_chars or 2 * every slides; the
+    boundaries after such a cut line up again at the next content boundary.
+    """
+    chunks = []
+    current = []
+    used = 0
+    for slide in deck.slides:
+        size = len(slide.to_compact()) + 1
+        if current and used + size > max_chars:
+            chunks.append(current)
+            current = []
+            used = 0
+        current.append(slide)
+        used += size
+        if ends_chunk(slide, every) or len(current) >= 2 * every:
+            chunks.append(current)
+            current = []
+            used = 0
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def build_map_prompt(chunk: list[Slide]) -> str:
+    body = "\n".join(slide.to_compact() for slide in chunk)
+    return f"""
+Summarise these pitch deck slides for a business analyst.
+
+SLIDES (one block per slide: "[S#] title", one line per bullet, "*" before an emphasised line, *inline* highlights, "metrics:" / "key:" for figures and highlights not in the lines):
+{body}
+
+Return 5-10 short plain-text lines, one fact per line, no preamble. Keep every number, unit, product name, customer segment, technology and stated problem exactly as written. Do not add anything not in the slides.
+"""
+
+
+# === Map / Reduce ===
+def summarise_chunks(chunks, query, model_id, cache=None, concurrency=MAP_CONCURRENCY):
+    stats = StageStats()
+    summaries = [None] * len(chunks)
+    pending = []
+
+    for i, chunk in enumerate(chunks):
+        prompt = build_map_prompt(chunk)
+        key = MapCache.key(model_id, prompt)
+        cached = cache.get(key) if cache is not None else None
+        if cached is not None:
+            summaries[i] = cached
+            stats.cache_hits += 1
+        else:
+            pending.append((i, key, prompt))
+
+    def run(item):
+        i, key, prompt = item
+        usage = {}
+        summary = query(prompt, usage=usage)
+        return i, key, summary, usage
+
+    start = time.perf_counter()
+    if pending:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            # Worker threads don't inherit contextvars (e.g. the admission lane)
+            context = contextvars.copy_context()
+            for i, key, summary, usage in pool.map(lambda item: context.copy().run(run, item), pending):
+                summaries[i] = summary
+                stats.calls += 1
+                stats.input_tokens += usage.get("inputTokens", 0)
+                stats.output_tokens += usage.get("outputTokens", 0)
+                if cache is not None:
+                    cache.put(key, summary)
+        if cache is not None:
+            cache.save()
+    stats.seconds = time.perf_counter() - start
+    return summaries, stats
+
+
+def summary_deck(chunks, summaries, spans: dict | None = None) -> tuple[Deck, dict]:
+    """Reduce-stage input: one pseudo-slide per summarised chunk.
+
+    spans maps each input slide number to the (first, last) original slides
+    it covers, so re-mapped summaries keep their original titles. Returns the
+    deck and the spans of its pseudo-slides.
+    """
+    slides = []
+    summary_spans = {}
+    for number, (chunk, summary) in enumerate(zip(chunks, summaries), 1):
+        first = spans[chunk[0].number][0] if spans else chunk[0].number
+        last = spans[chunk[-1].number][1] if spans else chunk[-1].number
+        title = f"Slides {first}-{last}" if first != last else f"Slide {first}"
+        bullets = [line.strip().lstrip("-•* ").strip() for line in summary.splitlines()]
+        slides.append(Slide(number=number, title=title, bullets=[b for b in bullets if b]))
+        summary_spans[number] = (first, last)
+    return Deck(slides=slides), summary_spans
+
+
+def reduce_input(deck: Deck, query, model_id, cache=None, concurrency=MAP_CONCURRENCY,
+                 budget: int = 4000) -> tuple[Deck, dict]:
+    """Summarise chunks, then the summaries, until they fit `budget` or MAX_MAP_ROUNDS is reached.
+
+    Returns the pseudo-slide deck and StageStats per round ("map", "map-2", ...);
+    the last round's `dropped` counts summaries the prompt still cuts.
+    """
+    stats = {}
+    spans = None
+    for round_number in range(1, MAX_MAP_ROUNDS + 1):
+        chunks = chunk_slides(deck)
+        summaries, round_stats = summarise_chunks(chunks, query, model_id, cache, concurrency)
+        stats["map" if round_number == 1 else f"map-{round_number}"] = round_stats
+        deck, spans = summary_deck(chunks, summaries, spans)
+        if not exceeds_budget(deck, budget) or len(deck.slides) == 1:
+            break
+    round_stats.dropped = dropped_slides(deck, budget)
+    return deck, stats
+
+
+def stats_headers(timings: dict, stats: dict, usage: dict) -> dict:
+    """Per-stage wall time as Server-Timing plus map/model token counts as JSON"""
+    timing = ", ".join(f"{name};dur={seconds * 1000:.0f}" for name, seconds in timings.items())
+    tokens = {name: asdict(s) for name, s in stats.items()}
+    tokens["model"] = {
+        "input_tokens": usage.get("inputTokens", 0),
+        "output_tokens": usage.get("outputTokens", 0),
+        "estimated": usage.get("estimatedTokens", False),
+    }
+    return {"Server-Timing": timing, "X-Stage-Stats": json.dumps(tokens)}
@@ -0,0 +1,45 @@
+"""Shared extract -> pack -> prompt -> model -> parse -> validate pipeline.
+
+The FastAPI and Streamlit entry points only choose stages and render the
+result; FastAPI-specific helpers live in pipeline.service so the Streamlit
+apps don't import FastAPI.
+"""
+from .core import CacheHook, Features, Hook, Pipeline, PipelineRun, TimingHook
+from .inference_policy import BoundPolicy, InferencePolicy, TierConfig
+from .models import CLAUDE_HAIKU, NOVA_MICRO_ARN, NOVA_PRO_ARN, ClaudeClient, NovaClient
+from .packer import MapReducePacker, single_pass
+from .parser import parse_json, parse_strict_json
+from .prompts import ANALYST_V1, COFFEE_CHAT_V1, HIGHLIGHTS_V1, PROMPTS, V8, PromptTemplate
+from .stream_guard import StreamAborted, StreamGuard
+from .validator import FALLBACK_RESULT, validate
+
+__all__ = [
+    "ANALYST_V1",
+    "BoundPolicy",
+    "CLAUDE_HAIKU",
+    "COFFEE_CHAT_V1",
+    "CacheHook",
+    "ClaudeClient",
+    "FALLBACK_RESULT",
+    "Features",
+    "HIGHLIGHTS_V1",
+    "Hook",
+    "InferencePolicy",
+    "MapReducePacker",
+    "NOVA_MICRO_ARN",
+    "NOVA_PRO_ARN",
+    "NovaClient",
+    "PROMPTS",
+    "Pipeline",
+    "PipelineRun",
+    "PromptTemplate",
+    "StreamAborted",
+    "StreamGuard",
+    "TierConfig",
+    "TimingHook",
+    "V8",
+    "parse_json",
+    "parse_strict_json",
+    "single_pass",
+    "validate",
+]
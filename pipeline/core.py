@@ -0,0 +1,181 @@
+import functools
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import IO, Callable, Protocol
+
+from deck_structure import Deck
+
+
+# === Stage Interfaces ===
+class Extractor(Protocol):
+    def __call__(self, file_path: str | IO[bytes]) -> Deck: ...
+
+
+class Packer(Protocol):
+    def __call__(self, deck: Deck, run: "PipelineRun") -> Deck: ...
+
+
+class PromptBuilder(Protocol):
+    def __call__(self, typed_text: str, deck: Deck) -> str: ...
+
+
+class ModelClient(Protocol):
+    def __call__(self, prompt: str, usage: dict | None = None) -> str: ...
+
+
+class Parser(Protocol):
+    def __call__(self, raw: str) -> dict | None: ...
+
+
+class Validator(Protocol):
+    def __call__(self, parsed: dict | None) -> tuple[dict, list[str]]: ...
+
+
+class Features(Protocol):
+    """Fast local candidates computed from the deck, merged into a copy of the validated result"""
+
+    def __call__(self, deck: Deck, typed_input: str = "", deck_hash: str = "") -> dict: ...
+
+    def merge(self, result: dict, features: dict) -> dict: ...
+
+
+@dataclass
+class PipelineRun:
+    """Everything one analysis produces, stage by stage"""
+    typed_input: str
+    file_path: str | IO[bytes]
+    deck_hash: str = ""
+    mode: str = "auto"
+    deck: Deck | None = None
+    features: dict | None = None
+    packed: Deck | None = None
+    prompt: str = ""
+    raw_output: str = ""
+    parsed: dict | None = None
+    result: dict | None = None
+    # result with the feature candidates merged in, for the response; result alone is what the model said
+    merged: dict | None = None
+    errors: list[str] = field(default_factory=list)
+    usage: dict = field(default_factory=dict)
+    stats: dict = field(default_factory=dict)
+    timings: dict = field(default_factory=dict)
+
+
+# === Hooks ===
+class Hook:
+    """Wraps every stage call; override around() to observe or short-circuit it"""
+
+    def around(self, stage: str, run: PipelineRun, call: Callable):
+        return call()
+
+
+class TimingHook(Hook):
+    def around(self, stage, run, call):
+        start = time.perf_counter()
+        try:
+            return call()
+        finally:
+            run.timings[stage] = run.timings.get(stage, 0.0) + time.perf_counter() - start
+
+
+class CacheHook(Hook):
+    """LRU cache for one stage's output, keyed by key(run); a None key bypasses it.
+
+    `shared` (anything with get/put, e.g. shared_state.SharedCache) is checked on
+    a local miss and filled on compute, so workers reuse each other's results.
+    """
+
+    def __init__(self, stage: str, key: Callable[[PipelineRun], str | None], maxsize: int = 128,
+                 shared=None):
+        self.stage = stage
+        self.key = key
+        self.maxsize = maxsize
+        self.shared = shared
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def around(self, stage, run, call):
+        key = self.key(run) if stage == self.stage else None
+        if key is None:
+            return call()
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+        value = self.shared.get(key) if self.shared is not None else None
+        if value is None:
+            value = call()
+            if self.shared is not None:
+                self.shared.put(key, value)
+        with self.lock:
+            self.entries[key] = value
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return value
+
+
+# === Pipeline ===
+class Pipeline:
+    """extract [-> features] -> pack -> prompt -> model -> parse -> validate, each call routed through the hooks"""
+
+    def __init__(self, extractor: Extractor, packer: Packer, prompt: PromptBuilder,
+                 model: ModelClient, parser: Parser, validator: Validator,
+                 hooks: list[Hook] | None = None, prompt_version: str | None = None,
+                 model_id: str = "", features: Features | None = None):
+        self.extractor = extractor
+        self.packer = packer
+        self.prompt = prompt
+        self.model = model
+        self.parser = parser
+        self.validator = validator
+        self.features = features
+        self.hooks = [TimingHook()] if hooks is None else hooks
+        self.prompt_version = prompt_version or getattr(prompt, "version", "")
+        self.model_id = model_id or getattr(model, "model_id", "")
+
+    def _call(self, stage: str, run: PipelineRun, fn: Callable, *args):
+        call = functools.partial(fn, *args)
+        for hook in reversed(self.hooks):
+            call = functools.partial(hook.around, stage, run, call)
+        return call()
+
+    def extract(self, run: PipelineRun) -> PipelineRun:
+        run.deck = self._call("extract", run, self.extractor, run.file_path)
+        if self.features is not None:
+            run.features = self._call("features", run, self.features, run.deck, run.typed_input, run.deck_hash)
+        return run
+
+    def analyse(self, run: PipelineRun) -> PipelineRun:
+        run.packed = self._call("pack", run, self.packer, run.deck, run)
+        run.prompt = self._call("prompt", run, self.prompt, run.typed_input, run.packed)
+        run.raw_output = self._call("model", run, self.model, run.prompt, run.usage)
+        run.parsed = self._call("parse", run, self.parser, run.raw_output)
+        run.result, run.errors = self._call("validate", run, self.validator, run.parsed)
+        run.merged = run.result
+        # A fallback result stays as it is
+        if run.features is not None and run.parsed is not None:
+            run.merged = self.features.merge(run.result, run.features)
+        return run
+
+    def run(self, typed_input: str, file_path: str | IO[bytes], deck_hash: str = "", mode: str = "auto") -> PipelineRun:
+        run = PipelineRun(typed_input=typed_input, file_path=file_path, deck_hash=deck_hash, mode=mode)
+        return self.analyse(self.extract(run))
+
+    def run_bytes(self, typed_input: str, data: bytes, mode: str = "auto") -> PipelineRun:
+        """Run an in-memory PDF (e.g. a Streamlit upload) through a temporary file"""
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
+            tmp.write(data)
+            file_path = tmp.name
+        try:
+            return self.run(typed_input, file_path, hashlib.sha256(data).hexdigest(), mode)
+        finally:
+            os.remove(file_path)
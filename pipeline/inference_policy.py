@@ -0,0 +1,119 @@
+import json
+import math
+import os
+import threading
+from collections import deque
+from dataclasses import dataclass
+
+
+@dataclass(slots=True)
+class TierConfig:
+    """Inference settings for one endpoint/tier.
+
+    max_new_tokens is both the budget used until enough outputs have been
+    observed and the ceiling afterwards; the learned budget is the chosen
+    percentile of recent output lengths times headroom, never below
+    min_new_tokens.
+    """
+    max_new_tokens: int
+    temperature: float
+    min_new_tokens: int = 256
+    headroom: float = 1.2
+    percentile: float = 95
+    min_samples: int = 20
+
+
+# Samples estimated from text length (streams closed before Bedrock reported
+# usage) are kept under their own key, apart from reported token counts
+ESTIMATED_SUFFIX = "#estimated"
+
+
+class InferencePolicy:
+    """Chooses inferenceConfig per endpoint, tier and prompt version from observed output lengths.
+
+    Samples are kept in memory and, with state_path, in a JSON snapshot
+    written by this process. With `shared` (a shared_state.SampleWindow) they
+    live there instead, so every worker learns from every request. Reported
+    token counts are preferred once there are min_samples of them; until then
+    the estimated ones are used.
+    """
+
+    def __init__(self, tiers: dict, state_path=None, window: int = 200, shared=None):
+        self.tiers = tiers
+        self.state_path = state_path
+        self.window = window
+        self.shared = shared
+        self.samples = {}
+        self.lock = threading.Lock()
+        if shared is None and state_path and os.path.exists(state_path):
+            with open(state_path, encoding="utf-8") as f:
+                for version, lengths in json.load(f).items():
+                    self.samples[version] = deque(lengths, maxlen=window)
+
+    def tier_config(self, endpoint: str, tier: str) -> TierConfig:
+        return self.tiers.get((endpoint, tier)) or self.tiers[(endpoint, "interactive")]
+
+    def lengths(self, key: str) -> list:
+        if self.shared is not None:
+            return self.shared.values(key)
+        with self.lock:
+            return list(self.samples.get(key, ()))
+
+    def config(self, endpoint: str, tier: str, prompt_version: str) -> dict:
+        tier_config = self.tier_config(endpoint, tier)
+        lengths = self.lengths(prompt_version)
+        if len(lengths) < tier_config.min_samples:
+            lengths = self.lengths(prompt_version + ESTIMATED_SUFFIX)
+        lengths.sort()
+        max_new_tokens = tier_config.max_new_tokens
+        if len(lengths) >= tier_config.min_samples:
+            index = min(len(lengths) - 1, math.ceil(tier_config.percentile / 100 * len(lengths)) - 1)
+            learned = math.ceil(lengths[index] * tier_config.headroom)
+            max_new_tokens = max(tier_config.min_new_tokens, min(max_new_tokens, learned))
+        return {"max_new_tokens": max_new_tokens, "temperature": tier_config.temperature}
+
+    def record(self, prompt_version: str, output_tokens: int, max_new_tokens: int, truncated: bool,
+               estimated: bool = False):
+        if truncated:
+            # A truncated output says nothing about the true length except that it
+            # was longer, so count it as 1.5x the budget to pull the percentile up,
+            # whichever window is in use
+            length = math.ceil(max_new_tokens * 1.5)
+            keys = (prompt_version, prompt_version + ESTIMATED_SUFFIX)
+        else:
+            length = output_tokens
+            keys = (prompt_version + ESTIMATED_SUFFIX if estimated else prompt_version,)
+
+        if self.shared is not None:
+            for key in keys:
+                self.shared.append(key, length)
+            return
+        with self.lock:
+            for key in keys:
+                self.samples.setdefault(key, deque(maxlen=self.window)).append(length)
+            if not self.state_path:
+                return
+            data = json.dumps({key: list(lengths) for key, lengths in self.samples.items()})
+            tmp_path = self.state_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp_path, self.state_path)
+
+    def bind(self, endpoint: str, prompt_version: str, tier=lambda: "interactive") -> "BoundPolicy":
+        return BoundPolicy(self, endpoint, prompt_version, tier)
+
+
+class BoundPolicy:
+    """The policy as seen by one model client; tier() is read per call (e.g. the admission lane)"""
+
+    def __init__(self, policy: InferencePolicy, endpoint: str, prompt_version: str, tier):
+        self.policy = policy
+        self.endpoint = endpoint
+        self.prompt_version = prompt_version
+        self.tier = tier
+
+    def config(self) -> dict:
+        return self.policy.config(self.endpoint, self.tier(), self.prompt_version)
+
+    def record(self, output_tokens: int, max_new_tokens: int, truncated: bool, estimated: bool = False):
+        self.policy.record(self.prompt_version, output_tokens, max_new_tokens, truncated, estimated)
@@ -0,0 +1,151 @@
+import json
+
+from clients import bedrock_runtime
+
+from .stream_guard import StreamAborted, StreamGuard
+
+NOVA_MICRO_ARN = "arn:aws:bedrock:ap-south-1:069717477936:inference-profile/apac.amazon.nova-micro-v1:0"
+NOVA_PRO_ARN = "arn:aws:bedrock:ap-south-1:069717477936:inference-profile/apac.amazon.nova-pro-v1:0"
+CLAUDE_HAIKU = "claude-3-5-haiku-20241022"
+# Rough chars-per-token, for streams closed before Bedrock reports usage
+CHARS_PER_TOKEN = 4
+
+
+# === Nova via AWS Bedrock ===
+class NovaClient:
+    """Streams a Nova completion, aborting generations that go off the rails.
+
+    Each delta is fed to a StreamGuard; when it gives up on the output the
+    stream is closed and the request retried (up to `retries` times) at a
+    lower temperature. expect_json=False only guards against repetition loops.
+
+    With a policy (a BoundPolicy) max_new_tokens and temperature come from it
+    per call and every output length is reported back to it. A JSON stream
+    is closed as soon as the top-level object is complete; its token counts
+    are then estimated from text length and usage["estimatedTokens"] is set.
+
+    rate_limiter (e.g. a shared_state.TokenBucket) is acquired before every
+    Bedrock request, retries included.
+    """
+
+    def __init__(self, model_id: str, max_new_tokens: int = 1000, temperature: float = 0.4,
+                 region_name: str = "ap-south-1", expect_json: bool = True, retries: int = 1,
+                 retry_temperature_step: float = 0.3, policy=None, rate_limiter=None):
+        self.model_id = model_id
+        self.max_new_tokens = max_new_tokens
+        self.temperature = temperature
+        self.region_name = region_name
+        self.expect_json = expect_json
+        self.retries = retries
+        self.retry_temperature_step = retry_temperature_step
+        self.policy = policy
+        self.rate_limiter = rate_limiter
+
+    def __call__(self, prompt_text: str, usage: dict | None = None) -> str:
+        if self.policy is not None:
+            config = self.policy.config()
+            max_new_tokens, base_temperature = config["max_new_tokens"], config["temperature"]
+        else:
+            max_new_tokens, base_temperature = self.max_new_tokens, self.temperature
+        usage = {} if usage is None else usage
+
+        for attempt in range(self.retries + 1):
+            temperature = max(0.0, base_temperature - attempt * self.retry_temperature_step)
+            try:
+                output_string = self._stream(prompt_text, max_new_tokens, temperature, usage,
+                                             StreamGuard(self.expect_json))
+                break
+            except StreamAborted as e:
+                output_string = e.args[1]
+                usage.setdefault("aborted", []).append(e.args[0])
+        # If every attempt was aborted this is the last partial output, for the parser's fallback
+
+        usage["maxNewTokens"] = max_new_tokens
+        if self.policy is not None and "outputTokens" in usage:
+            self.policy.record(usage["outputTokens"], max_new_tokens, usage.get("stopReason") == "max_tokens",
+                               usage.get("estimatedTokens", False))
+        return output_string
+
+    def _stream(self, prompt_text: str, max_new_tokens: int, temperature: float, usage: dict,
+                guard: StreamGuard) -> str:
+        body = {
+            "inferenceConfig": {
+                "max_new_tokens": max_new_tokens,
+                "temperature": temperature
+            },
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [{"text": prompt_text}]
+                }
+            ]
+        }
+
+        if self.rate_limiter is not None:
+            usage["rateLimitWait"] = usage.get("rateLimitWait", 0.0) + self.rate_limiter.acquire()
+        response = bedrock_runtime(self.region_name).invoke_model_with_response_stream(
+            modelId=self.model_id,
+            contentType="application/json",
+            accept="application/json",
+            body=json.dumps(body)
+        )
+
+        stream = response["body"]
+        output_string = ""
+        usage.pop("estimatedTokens", None)
+        for event in stream:
+            if "chunk" in event:
+                chunk = event["chunk"]["bytes"]
+                if chunk:
+                    try:
+                        payload = json.loads(chunk.decode("utf-8"))
+                    except Exception:
+                        continue
+                    if "contentBlockDelta" in payload:
+                        delta = payload["contentBlockDelta"]["delta"].get("text", "")
+                        output_string += delta
+                        try:
+                            guard.feed(delta)
+                        except StreamAborted as e:
+                            # Stop generation (and token spend) instead of draining the stream
+                            stream.close()
+                            raise StreamAborted(e.args[0], output_string) from None
+                        if guard.closed:
+                            # The JSON object is complete; anything after it would be discarded.
+                            # Bedrock reports usage only at the end, so both counts are estimates
+                            stream.close()
+                            usage["stopReason"] = "json_complete"
+                            usage["inputTokens"] = -(-len(prompt_text) // CHARS_PER_TOKEN)
+                            usage["outputTokens"] = -(-len(output_string) // CHARS_PER_TOKEN)
+                            usage["estimatedTokens"] = True
+                            break
+                    elif "messageStop" in payload:
+                        usage["stopReason"] = payload["messageStop"].get("stopReason")
+                    elif "metadata" in payload:
+                        usage.update(payload["metadata"].get("usage", {}))
+        return output_string
+
+
+# === Claude via Anthropic ===
+class ClaudeClient:
+    """api_key may be a callable so Streamlit secrets are only read on first use"""
+
+    def __init__(self, api_key, model_id: str = CLAUDE_HAIKU, max_tokens: int = 1500):
+        self.api_key = api_key
+        self.model_id = model_id
+        self.max_tokens = max_tokens
+
+    def __call__(self, prompt: str, usage: dict | None = None) -> str:
+        import anthropic
+
+        api_key = self.api_key() if callable(self.api_key) else self.api_key
+        client = anthropic.Anthropic(api_key=api_key)
+        response = client.messages.create(
+            model=self.model_id,
+            max_tokens=self.max_tokens,
+            messages=[{"role": "user", "content": prompt}]
+        )
+        if usage is not None and getattr(response, "usage", None):
+            usage["inputTokens"] = response.usage.input_tokens
+            usage["outputTokens"] = response.usage.output_tokens
+        return response.content[0].text if response.content else ""
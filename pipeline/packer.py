@@ -0,0 +1,35 @@
+from deck_structure import Deck
+from map_reduce import MAP_CONCURRENCY, MapCache, exceeds_budget, reduce_input
+
+PROMPT_BUDGET = 4000
+
+
+def single_pass(deck: Deck, run) -> Deck:
+    """Send the deck as-is; Deck.to_compact() drops whole slides past the prompt budget"""
+    return deck
+
+
+class MapReducePacker:
+    """Replace long decks with per-chunk summaries so the prompt stage acts as the reduce call.
+
+    Summaries that together are still over the budget are summarised again,
+    so the reduce prompt covers the whole deck instead of its first chunks.
+
+    run.mode "auto" only summarises decks over the prompt budget, "map-reduce"
+    always does and "single" never does.
+    """
+
+    def __init__(self, model, model_id: str, cache: MapCache | None = None,
+                 budget: int = PROMPT_BUDGET, concurrency: int = MAP_CONCURRENCY):
+        self.model = model
+        self.model_id = model_id
+        self.cache = cache
+        self.budget = budget
+        self.concurrency = concurrency
+
+    def __call__(self, deck: Deck, run) -> Deck:
+        if run.mode == "single" or (run.mode != "map-reduce" and not exceeds_budget(deck, self.budget)):
+            return deck
+        packed, stats = reduce_input(deck, self.model, self.model_id, self.cache, self.concurrency, self.budget)
+        run.stats.update(stats)
+        return packed
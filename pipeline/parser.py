@@ -0,0 +1,22 @@
+import json
+import re
+
+
+def parse_strict_json(raw: str) -> dict | None:
+    """The model output itself must be a JSON object"""
+    try:
+        value = json.loads(raw)
+    except json.JSONDecodeError:
+        return None
+    return value if isinstance(value, dict) else None
+
+
+def parse_json(raw: str) -> dict | None:
+    """Like parse_strict_json, but falls back to the outermost {...} in the response"""
+    value = parse_strict_json(raw.strip())
+    if value is not None:
+        return value
+    json_match = re.search(r'\{.*\}', raw, re.DOTALL)
+    if json_match:
+        return parse_strict_json(json_match.group(0))
+    return None
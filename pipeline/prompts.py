@@ -0,0 +1,312 @@
+from dataclasses import dataclass
+from typing import Callable
+
+from deck_structure import Deck
+
+
+# === Business-analyst deep-research prompt (main.py, app.py) ===
+def analyst_prompt(typed_text: str, deck: Deck) -> str:
+    return f"""
+You are tasked as a business analyst conducting deep research on innovative companies. Your job is to analyze product information and return comprehensive insights as JSON.
+
+**CONTENT TO ANALYZE:**
+Founder Notes: {typed_text}
+Pitch Content (one block per slide: "[S#] title", one line per bullet, "*" before an emphasised line, *inline* highlights, "metrics:" / "key:" for figures and highlights not in the lines):
+{deck.to_compact()}
+
+**REQUIRED JSON OUTPUT:**
+{{
+  "title": "Product name with key differentiator",
+  "description": "Detailed 3-4 sentence explanation of what the product does, target market, and quantifiable impact",
+  "audience": "Return a concise, comma-separated list of specific user types relevant to the product — such as roles, industries, or customer segments — based only on the input content. Do not generate paragraphs or explanations.",
+  "problemStatements": [
+    "Articulate a significant problem statement unique to the domain, considering nuances and impacts.",
+    "Define another distinct problem that addresses a different dimension with real-world implications.", 
+    "Develop a third problem statement focusing on another aspect, bringing forward contextual challenges."
+  ],
+  "tags": ["Identify technical and business keywords drawn from content specifics"],
+  "followUpQuestions": [
+    "Derive a question regarding an intriguing unique aspect of the company, emphasizing why it matters.",
+    "Formulate a differentiated inquiry about another distinctive characteristic, showcasing deep understanding.",
+    "Propose a distinct question exploring an aspect that only this company could authentically answer."
+  ],
+  "burningProblems": [
+    "Acknowledgment of a current business challenge grounded in their market position or business stage.",
+    "Assessment of a pressing issue pertinent to their operational, growth, and strategic landscapes.", 
+    "Declaration of a realistic business challenge with immediate practical implications."
+  ]
+}}
+
+**DETAILED ANALYSIS REQUIREMENTS:**
+
+**PROBLEM STATEMENTS (2-3 sentences each):**
+Ensure problem statements are derived from actual content, reflecting specific sector challenges and impacts. Articulate who the problems affect, why they matter, supported by quantifiable data where possible.
+
+**FOLLOW-UP QUESTIONS:**
+Identify 3 genuinely unique aspects of the content that warrant exploration. Craft questions that reveal insightful understanding of those specific facets.
+
+QUESTION CREATION RULES:
+- Focus on intriguing, detailed company-specific information.
+- Explore implementation, rationale, or impacts of these aspects.
+- Formulate structurally distinct questions relevant only to this company.
+- Keep curiosity grounded in demonstrated facts.
+
+**BURNING PROBLEMS (business challenge statements):**
+Assess the business landscape and extract 3 genuine challenges being faced. Address immediate, identifiable obstacles with clarity, focusing on their business dimensions.
+
+CHALLENGE IDENTIFICATION:
+- Consider their market position, business stage, and sector context.
+- Highlight current operational, growth, and strategic challenges.
+- Make challenges specific and relevant without relying on general templates.
+
+**QUALITY STANDARDS:**
+- Output must reflect detailed understanding based on specific input content.
+- Avoid generic language; adapt to content-specific terminology and context.
+- Content should be substantial and reflective of the unique business situation.
+
+**CONTENT EXTRACTION RULES:**
+- Ensure extraction is true to the input specifics, including technologies, customer segments, and terminology.
+- Avoid adding information not present in the input.
+
+**CRITICAL FORMATTING:**
+- Arrays should contain exactly 3 string items per requirement.
+- Include fully developed content for each item with no single-sentence responses.
+- Ensure outputs are comprehensive, specific, and tailored to the company.
+
+**FINAL CHECK:**
+Verify outputs reflect an understanding of a unique, specific business with distinct challenges. Generic outputs applicable to multiple companies are unacceptable.
+
+Respond with valid JSON only.
+"""
+
+
+# === "Coffee chat" founder-curiosity prompt (main1.py) ===
+def coffee_chat_prompt(typed_text: str, deck: Deck) -> str:
+    return f"""
+Analyze this startup as if you're meeting the founder for coffee and genuinely curious about what they're building.
+
+**FOUNDER NOTES:**
+{typed_text}
+
+**PITCH DECK CONTENT:**
+{deck.to_compact()}
+
+Your goal: Understand their world deeply enough to ask questions that make them think "Wow, this person really gets what I'm trying to do."
+
+Think about:
+- What's truly unique about their approach?
+- What assumptions are they making that might be wrong?
+- What details did they skip over that seem important?
+- What would worry you if you were in their shoes?
+- What would you be curious about if this was your friend's startup?
+
+Generate follow-up questions that show you understand their specific context. Each question should make the founder pause and think - not give rehearsed answers they've given a hundred times before.
+
+For burning problems, think about what specifically stresses THIS founder out. Not what stresses all founders, but what keeps THIS person awake based on what they're actually building and the world they're operating in.
+
+Be intellectually curious. Use your understanding of their domain, technology, market, and situation to generate insights that feel personal and relevant to their journey.
+
+Output ONLY valid JSON:
+
+{{
+  "title": "Product name and positioning",
+  "description": "Clear explanation showing you understand what they're building and why it matters",
+  "audience": "Who will actually pay for this product",
+  "problemStatements": [
+    "Three specific problems this product addresses"
+  ],
+  "tags": [
+    "5-8 relevant tags about the product/technology/domain"
+  ],
+  "followUpQuestions": [
+    "Three questions that demonstrate deep understanding of their specific situation"
+  ],
+  "burningProblems": [
+    "Three specific challenges THIS founder likely faces based on their context"
+  ]
+}}
+
+Trust your intelligence. Be genuinely curious about their specific situation."""
+
+
+# === V8 dynamic content-driven analysis prompt (main2.py) ===
+def v8_prompt(typed_text: str, deck: Deck) -> str:
+    return f"""
+Analyze this product information and return insights as JSON.
+
+**INPUT:**
+Founder Notes: {typed_text}
+Pitch Content (one block per slide: "[S#] title", one line per bullet, "*" before an emphasised line, *inline* highlights, "metrics:" / "key:" for figures and highlights not in the lines):
+{deck.to_compact()}
+
+**OUTPUT (JSON only):**
+{{
+  "title": "Product name with key differentiator that captures the core innovation or unique positioning",
+  "description": "A compelling 2-3 sentence explanation that clearly articulates what the product does, the specific target market it serves, and the quantifiable impact or transformation it delivers. Highlight the core technology and unique value proposition that sets it apart from existing solutions.",
+  "audience": "The primary user/buyer segment with specific details about their roles, industry context, current pain points, and what they specifically value in a solution. Include their decision-making criteria and typical operational challenges.",
+  "problemStatements": [
+    "Extract and articulate the first major pain point or inefficiency that this specific product directly addresses. Base this entirely on what's mentioned or implied in the input content. Include quantifiable impacts, specific industry context, or measurable consequences where available.",
+    "Extract and articulate the second distinct challenge that this product solves. Focus on different aspects of the problem space mentioned in the content. Include specific details about how this manifests for their target users.",
+    "Extract and articulate the third problem area this product tackles. Ensure this addresses a different dimension of their solution space. Include context about why this problem matters specifically to their audience."
+  ],
+  "tags": ["Domain-specific keywords derived directly from the content, including core technologies, industry verticals, business model type, competitive advantages, and unique technical approaches mentioned."],
+  "followUpQuestions": [
+    "First unique question based on specific content details",
+    "Second unique question based on different specific content details", 
+    "Third unique question based on different specific content details"
+  ],
+  "burningProblems": [
+    "First realistic business challenge statement",
+    "Second realistic business challenge statement",
+    "Third realistic business challenge statement"
+  ]
+}}
+
+**FOLLOW-UP QUESTIONS APPROACH:**
+
+Read the input content thoroughly and identify the most specific, unique, and interesting details mentioned. For each detail, create a question that explores that specific aspect in depth. The questions should sound natural and conversational, as if asked by someone genuinely curious about the unique aspects of their business.
+
+**QUESTION CREATION PROCESS:**
+1. Scan the content for specific technologies, methodologies, numbers, processes, customer segments, or unique approaches
+2. Pick the 3 most specific and unique details that would be interesting to explore further
+3. For each detail, create a question that naturally explores that specific aspect
+4. Each question should be completely different in structure and focus
+5. Questions should feel like they come from someone who carefully read and understood the content
+6. Avoid any repetitive patterns or similar question structures
+
+**QUESTION QUALITY CHECKS:**
+- Does this question reference something specific and unique from their content?
+- Would this exact question be impossible to ask about a different company?
+- Does it explore a genuinely interesting aspect of their approach?
+- Is it different in structure and focus from the other questions?
+
+**BURNING PROBLEMS APPROACH:**
+
+Analyze the business context, stage, market, and operational details mentioned in the content. Based on this analysis, identify three realistic business challenges they are likely managing right now. Write these as clear, factual statements about what they are working on or dealing with.
+
+**PROBLEM IDENTIFICATION PROCESS:**
+1. Consider their current business stage and market position
+2. Think about typical challenges for their industry and business model
+3. Factor in their specific customer base and operational approach
+4. Identify immediate, practical challenges they would be managing
+5. Write each as a straightforward statement about their current situation
+
+**PROBLEM STATEMENT GUIDELINES:**
+- Write as factual statements about what they are likely managing or working on
+- Focus on immediate, practical business challenges
+- Avoid overly technical assumptions
+- Keep statements realistic and grounded in common business challenges
+- Each problem should address a different aspect of their business (operations, growth, market, etc.)
+- Make problems specific to their situation but not overly complex
+
+**CONTENT ANALYSIS RULES:**
+
+Extract information directly from the provided content. Do not add information not present in the input. Focus on what makes this specific business unique based on their content.
+
+For each section:
+- **problemStatements**: Extract actual problems mentioned or clearly implied in the content
+- **followUpQuestions**: Create questions about the most specific and unique aspects mentioned
+- **burningProblems**: Infer realistic challenges based on their described business context
+
+**CRITICAL REQUIREMENTS:**
+- All questions must be completely different in structure and content
+- All problems must be written as statements, not questions
+- Focus on what makes this business unique based on their specific content
+- Avoid generic business terminology unless specific to their content
+- Ensure each element would be completely different for different businesses
+- **CRITICAL**: Ensure 'problemStatements', 'followUpQuestions', and 'burningProblems' are always lists of exactly three separate string items
+
+**UNIQUENESS TEST:**
+Before finalizing the output, verify that if you were given completely different input content from a different domain, your questions and problems would be entirely different. If they wouldn't be, revise to make them more specific to this particular business.
+"""
+
+
+# === Headline-weighted validation prompt (Ai_app.py) ===
+def highlights_prompt(typed_text: str, deck: Deck) -> str:
+    return f"""
+You are an expert business analyst helping validate early-stage startup ideas.
+
+CONTENT PROVIDED:
+- Founder Notes: {typed_text}
+- Pitch Deck, one block per slide ("[S#] title", one line per bullet, "*" before a bolded or large-font line, *inline* highlighted phrases, "metrics:" figures and "key:" highlights not in the lines):
+{deck.to_compact()}
+
+TASK: Analyze the above and return structured business insights in JSON.
+
+RULES:
+- Give high weight to slide titles, "*" lines and *highlighted* phrases (headlines), especially if they include metrics, claims, or positioning statements.
+- Always extract and elevate meaningful quantitative or strategic information from headers and key sentences.
+- Pay attention to **finance, marketing, business model, legal/compliance, growth strategy, operations, and product** — not just technical aspects.
+- Avoid assumptions; stick to the content.
+
+OUTPUT FORMAT (respond with valid JSON only):
+
+{{
+  "title": "Product name with key differentiator",
+  "description": "3–4 sentence explanation of what the product does, for whom, and why it matters — using real metrics or content if available",
+  "audience": "Comma-separated list of specific roles, users, or customer types derived from content — no full sentences",
+  "problemStatements": [
+    "...",
+    "...",
+    "..."
+  ],
+  "tags": ["...", "...", "..."],
+  "followUpQuestions": [
+    "...",
+    "...",
+    "..."
+  ],
+  "burningProblems": [
+    "...",
+    "...",
+    "..."
+  ]
+}}
+
+REQUIREMENTS FOR EACH SECTION:
+
+**PROBLEM STATEMENTS (2–3 sentences each):**
+- Must reflect nuanced, domain-specific pain points described or implied in the content.
+- Each should highlight who is affected and what consequences arise — with real-world or measurable impact if possible.
+
+**FOLLOW-UP QUESTIONS:**
+- Derive 3 original questions that reflect curiosity about this specific startup.
+- At least one must be business-related (finance, GTM, ops, legal, compliance, or marketing strategy).
+- Avoid early-stage clichés or generic curiosity.
+- Do not include multiple tech-only questions.
+
+**BURNING PROBLEMS:**
+- Identify 3 urgent business challenges the company is likely facing based on the content.
+- These can involve funding, team building, compliance, market entry, scalability, partnerships, or model limitations.
+- Use realistic, content-grounded framing — avoid hypotheticals.
+
+**QUALITY STANDARDS:**
+- Use only what’s found in the pitch or typed input.
+- Outputs must be grounded, original, and contextual.
+- Avoid generic templates, AI clichés, or surface-level speculation.
+
+FORMAT:
+- JSON only
+- Each array must have exactly 3 fully developed entries.
+- All entries must be tailored to the input, with no placeholders.
+
+Before generating, ensure the output reflects an understanding of a **real, specific company** with **real challenges and content** — not a hypothetical startup.
+"""
+
+
+# === Versioned Templates ===
+@dataclass(frozen=True, slots=True)
+class PromptTemplate:
+    version: str
+    build: Callable[[str, Deck], str]
+
+    def __call__(self, typed_text: str, deck: Deck) -> str:
+        return self.build(typed_text, deck)
+
+
+ANALYST_V1 = PromptTemplate("analyst-v1", analyst_prompt)
+COFFEE_CHAT_V1 = PromptTemplate("coffee-chat-v1", coffee_chat_prompt)
+V8 = PromptTemplate("v8", v8_prompt)
+HIGHLIGHTS_V1 = PromptTemplate("highlights-v1", highlights_prompt)
+
+PROMPTS = {template.version: template for template in (ANALYST_V1, COFFEE_CHAT_V1, V8, HIGHLIGHTS_V1)}
@@ -0,0 +1,250 @@
+import asyncio
+import json
+import os
+
+from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+
+from admission import AdmissionController, current_lane
+from analysis_store import AnalysisStore
+from clients import warm_up_lifespan
+from deck_features import FeatureIndex
+from deck_structure import Deck, extract_deck
+from profiling import RequestProfiler
+from shared_state import SharedState
+
+from .core import CacheHook, Pipeline, PipelineRun, TimingHook
+from .inference_policy import InferencePolicy, TierConfig
+from .models import NOVA_MICRO_ARN, NovaClient
+from .packer import single_pass
+from .upload import MAX_UPLOAD_BYTES, StreamingUpload
+from .validator import validate
+
+POLICY_WINDOW = 200
+# TierConfig fields per tier, before nova(tiers=...) and INFERENCE_TIERS overrides;
+# batch callers get more headroom
+DEFAULT_TIERS = {"interactive": {}, "batch": {"headroom": 1.5, "percentile": 99, "min_new_tokens": 256}}
+
+
+# === FastAPI Adapter ===
+async def lookup_cached(store, pipeline: Pipeline, deck_hash: str, typed_input: str) -> dict | None:
+    """The stored answer, with its feature candidates merged in as they were when it was fresh"""
+    found = await run_in_threadpool(
+        store.lookup, deck_hash, pipeline.prompt_version, pipeline.model_id, typed_input
+    )
+    if found is None:
+        return None
+    result, features = found
+    if features is not None and pipeline.features is not None:
+        return pipeline.features.merge(result, features)
+    return result
+
+
+async def run_upload(pipeline: Pipeline, admission, request, store=None,
+                     max_bytes: int = MAX_UPLOAD_BYTES, on_extracted=None) -> tuple[PipelineRun | None, dict | None]:
+    """Stream a typed_input + file form through the pipeline under the admission limits.
+
+    Returns (run, None), or (None, stored_result) when the store already has an
+    analysis of the same deck and notes. A client that sends X-Deck-SHA256 gets
+    that answer as soon as typed_input has arrived, before the file is read;
+    "Cache-Control: no-cache" forces a fresh analysis. on_extracted(run) is
+    called between the extract and model stages.
+    """
+    if request.headers.get("cache-control") == "no-cache":
+        store = None
+    claimed_hash = request.headers.get("x-deck-sha256") if store is not None else None
+
+    upload = StreamingUpload(request, max_bytes)
+    chunks = upload.chunks()
+    try:
+        async for _ in chunks:
+            if claimed_hash and "typed_input" in upload.fields:
+                cached = await lookup_cached(store, pipeline, claimed_hash, upload.fields["typed_input"])
+                if cached is not None:
+                    return None, cached
+                claimed_hash = None
+
+        typed_input = upload.fields.get("typed_input")
+        if typed_input is None or not upload.has_file:
+            raise HTTPException(status_code=422, detail="typed_input and file are required")
+        if store is not None:
+            cached = await lookup_cached(store, pipeline, upload.deck_hash, typed_input)
+            if cached is not None:
+                return None, cached
+
+        run = PipelineRun(
+            typed_input=typed_input,
+            file_path=upload.spool,
+            deck_hash=upload.deck_hash,
+            mode=upload.fields.get("mode", "auto"),
+        )
+        async with admission.stage("extract"):
+            await run_in_threadpool(pipeline.extract, run)
+        if on_extracted is not None:
+            on_extracted(run)
+        async with admission.stage("model"):
+            await run_in_threadpool(pipeline.analyse, run)
+        return run, None
+    finally:
+        await chunks.aclose()
+        upload.close()
+
+
+async def save_run(store, pipeline: Pipeline, run: PipelineRun, result: dict) -> int | None:
+    """Persist an analysis; runs whose model output could not be parsed are not stored,
+    so lookup_cached never serves a fallback answer as a hit. Feature candidates are
+    stored next to the result, never in it"""
+    if run.parsed is None:
+        return None
+    return await run_in_threadpool(
+        store.save, result, run.deck_hash, pipeline.prompt_version, pipeline.model_id,
+        run.typed_input, run.timings, run.features,
+    )
+
+
+def wants_provisional(request) -> bool:
+    return "application/x-ndjson" in request.headers.get("accept", "")
+
+
+async def stream_provisional(pipeline: Pipeline, admission, request, store, respond):
+    """run_upload as NDJSON: {"provisional": features} as soon as the deck is extracted,
+    then {"status": ..., "result": ...} with the body respond(run, cached) would return.
+
+    Anything that fails before extraction (admission, upload limits, a cache
+    hit) is answered exactly as the plain endpoint would answer it. The
+    admission and profiling middleware hold their state until the last line
+    is sent (admission.after_body).
+    """
+    extracted = asyncio.get_running_loop().create_future()
+
+    def on_extracted(run):
+        if not extracted.done():
+            extracted.set_result(run.features or {})
+
+    task = asyncio.create_task(run_upload(pipeline, admission, request, store, on_extracted=on_extracted))
+    await asyncio.wait({task, extracted}, return_when=asyncio.FIRST_COMPLETED)
+    if not extracted.done():
+        return await respond(*task.result())
+
+    async def lines():
+        try:
+            yield json.dumps({"provisional": extracted.result()}) + "\n"
+            try:
+                response = await respond(*await task)
+                yield json.dumps({"status": response.status_code, "result": json.loads(response.body)}) + "\n"
+            except HTTPException as e:
+                yield json.dumps({"status": e.status_code, "error": e.detail}) + "\n"
+            except Exception as e:
+                status_code = getattr(e, "status_code", 500)
+                yield json.dumps({"status": status_code, "error": str(e)}) + "\n"
+        finally:
+            # The client went away mid-stream; stop waiting on the model
+            if not task.done():
+                task.cancel()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+# === App Factory ===
+class Service:
+    """What every FastAPI entry point shares: admission control, the analysis store,
+    request profiling, multi-worker state and the inference policy.
+
+    Multi-worker mode (`uvicorn main:app --workers N`): with SHARED_STATE_PATH set,
+    workers share extracted decks, inference policy samples and one Bedrock
+    request rate (BEDROCK_RPS, BEDROCK_BURST) through a local SQLite file.
+
+    INFERENCE_TIERS (JSON) tunes the policy tiers without a code change, for
+    every endpoint ("*") or one: {"*": {"batch": {"headroom": 2}},
+    "idea-capture": {"interactive": {"percentile": 90}}}.
+    """
+
+    def __init__(self):
+        self.app = FastAPI(lifespan=warm_up_lifespan)
+        self.admission = AdmissionController()
+        self.admission.install(self.app)
+        self.store = AnalysisStore(os.environ.get("ANALYSIS_DB", "analyses.db"))
+        self.store.install(self.app)
+        # X-Profile: cprofile | sample profiles one request; PROFILE_SLOW_SECONDS samples slow ones
+        self.profiler = RequestProfiler.from_env()
+        self.profiler.install(self.app)
+
+        self.shared_state = SharedState.from_env()
+        self.bedrock_limit = policy_samples = None
+        if self.shared_state is not None:
+            self.bedrock_limit = self.shared_state.bucket(
+                "bedrock", rate=float(os.environ.get("BEDROCK_RPS", "5")),
+                capacity=float(os.environ.get("BEDROCK_BURST", "10")),
+            )
+            policy_samples = self.shared_state.window("inference-policy", maxlen=POLICY_WINDOW)
+        # max_new_tokens is learned per prompt version from observed output lengths
+        # (persisted when INFERENCE_POLICY_PATH is set); tiers are added by nova()
+        self.policy = InferencePolicy(
+            {}, state_path=os.environ.get("INFERENCE_POLICY_PATH"), window=POLICY_WINDOW, shared=policy_samples,
+        )
+        self.tier_overrides = json.loads(os.environ.get("INFERENCE_TIERS") or "{}")
+        self.pipeline = None
+
+    def cache(self, namespace: str, maxsize: int, encode=None, decode=None):
+        """A cache shared by all workers, or None outside multi-worker mode"""
+        if self.shared_state is None:
+            return None
+        return self.shared_state.cache(namespace, maxsize, encode, decode)
+
+    def nova(self, endpoint: str, prompt_version: str, max_new_tokens: int, temperature: float,
+             min_new_tokens: int = 256, tiers: dict | None = None, **kwargs) -> NovaClient:
+        """Nova Micro under the inference policy and the Bedrock rate limit.
+
+        Each tier's TierConfig is DEFAULT_TIERS, then tiers[tier] (TierConfig
+        fields), then INFERENCE_TIERS for "*" and for this endpoint.
+        """
+        for tier, defaults in DEFAULT_TIERS.items():
+            settings = {"max_new_tokens": max_new_tokens, "temperature": temperature,
+                        "min_new_tokens": min_new_tokens, **defaults}
+            for overrides in (tiers or {}, self.tier_overrides.get("*", {}), self.tier_overrides.get(endpoint, {})):
+                settings.update(overrides.get(tier, {}))
+            self.policy.tiers[(endpoint, tier)] = TierConfig(**settings)
+        return NovaClient(
+            NOVA_MICRO_ARN, max_new_tokens=max_new_tokens, temperature=temperature,
+            policy=self.policy.bind(endpoint, prompt_version, tier=current_lane.get),
+            rate_limiter=self.bedrock_limit, **kwargs,
+        )
+
+    async def save(self, run: PipelineRun) -> int | None:
+        return await save_run(self.store, self.pipeline, run, run.result)
+
+    async def capture(self, request, respond):
+        """Answer an /idea-capture request with respond(run, cached).
+        With Accept: application/x-ndjson, provisional tags/audience arrive first."""
+        if wants_provisional(request):
+            return await stream_provisional(self.pipeline, self.admission, request, self.store, respond)
+        return await respond(*await run_upload(self.pipeline, self.admission, request, self.store))
+
+
+def build_app(prompt, parser, max_new_tokens: int, temperature: float, make_packer=None,
+              tiers: dict | None = None) -> Service:
+    """A Service around extract -> pack -> prompt -> Nova Micro -> parser -> validate.
+
+    make_packer(service) builds the pack stage (default single_pass), so a
+    packer can get its own model client and shared cache. tiers overrides
+    the "idea-capture" TierConfig fields per tier (see Service.nova).
+    """
+    service = Service()
+    extract_cache = service.cache("extract", maxsize=256, encode=Deck.to_dict, decode=Deck.from_dict)
+    service.pipeline = Pipeline(
+        extractor=extract_deck,
+        packer=make_packer(service) if make_packer is not None else single_pass,
+        prompt=prompt,
+        model=service.nova("idea-capture", prompt.version, max_new_tokens, temperature, tiers=tiers),
+        parser=parser,
+        validator=validate,
+        hooks=[
+            TimingHook(), service.profiler.hook(),
+            CacheHook("extract", key=lambda run: run.deck_hash, shared=extract_cache),
+        ],
+        # Local tag/audience candidates, learned from past analyses, merged into every response
+        # (stored next to the model's result, not in it)
+        features=FeatureIndex.from_store(service.store),
+    )
+    return service
@@ -0,0 +1,81 @@
+# Characters allowed before the opening brace ("```json\n", "Here is the analysis:")
+PREAMBLE_LIMIT = 120
+REPEAT_TAIL = 64
+REPEAT_WINDOW = 1024
+REPEAT_COUNT = 4
+REPEAT_CHECK_EVERY = 128
+
+
+class StreamAborted(Exception):
+    pass
+
+
+class StreamGuard:
+    """Watches streamed model text and raises StreamAborted as soon as the output
+    can no longer parse as a JSON object (mismatched brackets, too much prose
+    before it) or has fallen into a repetition loop. Keys are left to the
+    validator, which accepts extra ones.
+
+    With expect_json=False (plain-text map summaries) only the repetition check runs.
+    """
+
+    def __init__(self, expect_json: bool = True):
+        self.expect_json = expect_json
+        self.text = ""
+        self.unchecked = 0
+        # JSON scanner state
+        self.stack = []
+        self.started = False
+        self.closed = False
+        self.in_string = False
+        self.escape = False
+
+    def feed(self, delta: str):
+        self.text += delta
+        if self.expect_json and not self.closed:
+            for char in delta:
+                self._scan(char)
+                if self.closed:
+                    break
+            if not self.started and len(self.text.lstrip()) > PREAMBLE_LIMIT:
+                raise StreamAborted("prose before JSON")
+
+        self.unchecked += len(delta)
+        if self.unchecked >= REPEAT_CHECK_EVERY:
+            self.unchecked = 0
+            self._check_repetition()
+
+    def _check_repetition(self):
+        if len(self.text) < REPEAT_TAIL * REPEAT_COUNT:
+            return
+        tail = self.text[-REPEAT_TAIL:]
+        if self.text[-REPEAT_WINDOW:].count(tail) >= REPEAT_COUNT:
+            raise StreamAborted("repetition loop")
+
+    def _scan(self, char: str):
+        if self.in_string:
+            if self.escape:
+                self.escape = False
+            elif char == "\\":
+                self.escape = True
+            elif char == '"':
+                self.in_string = False
+            return
+
+        if not self.started:
+            if char == "{":
+                self.started = True
+                self.stack.append("{")
+            return
+
+        if char == '"':
+            self.in_string = True
+        elif char in "{[":
+            self.stack.append(char)
+        elif char in "}]":
+            expected = "{" if char == "}" else "["
+            if not self.stack or self.stack[-1] != expected:
+                raise StreamAborted("mismatched brackets")
+            self.stack.pop()
+            if not self.stack:
+                self.closed = True
@@ -0,0 +1,120 @@
+import hashlib
+import tempfile
+
+from fastapi import HTTPException
+
+from admission import current_reservation
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # python-multipart < 0.0.13
+    from multipart.multipart import MultipartParser, parse_options_header
+
+MAX_UPLOAD_BYTES = 64 * 1024 * 1024
+MAX_FIELD_BYTES = 1024 * 1024
+# Uploads up to this size stay in memory; larger ones roll over to disk
+SPOOL_MEMORY_BYTES = 2 * 1024 * 1024
+
+
+class StreamingUpload:
+    """Parses a multipart/form-data body as it arrives.
+
+    The file part is hashed and size-checked chunk by chunk and written to a
+    spooled buffer, so nothing ever holds the whole upload as one bytes
+    object and the hash is ready the moment the body ends. Part data is
+    charged to the request's admission reservation as it arrives, so chunked
+    uploads count against the buffering limit too.
+    """
+
+    def __init__(self, request, max_bytes: int = MAX_UPLOAD_BYTES):
+        content_type, params = parse_options_header(request.headers.get("content-type", ""))
+        if content_type != b"multipart/form-data" or b"boundary" not in params:
+            raise HTTPException(status_code=415, detail="Expected multipart/form-data")
+
+        self.request = request
+        self.max_bytes = max_bytes
+        self.fields = {}
+        self.hasher = hashlib.sha256()
+        self.spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES, suffix=".pdf")
+        self.size = 0
+        self.received = 0
+        self.has_file = False
+        self.reservation = current_reservation.get()
+
+        self._headers = {}
+        self._header_field = b""
+        self._header_value = b""
+        self._name = None
+        self._is_file = False
+        self._value = bytearray()
+        self.parser = MultipartParser(params[b"boundary"], {
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        })
+
+    @property
+    def deck_hash(self) -> str:
+        return self.hasher.hexdigest()
+
+    async def chunks(self):
+        """Feed the body to the parser, yielding after each received chunk"""
+        async for chunk in self.request.stream():
+            self.parser.write(chunk)
+            yield
+        self.parser.finalize()
+        self.spool.seek(0)
+
+    def close(self):
+        self.spool.close()
+
+    # === Parser Callbacks ===
+    def _on_part_begin(self):
+        self._headers = {}
+        self._name = None
+        self._is_file = False
+        self._value = bytearray()
+
+    def _on_header_field(self, data, start, end):
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data, start, end):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        self._name = options.get(b"name", b"").decode("utf-8", "replace")
+        self._is_file = b"filename" in options
+        if self._is_file:
+            if self.has_file:
+                raise HTTPException(status_code=400, detail="Only one file per request")
+            self.has_file = True
+
+    def _on_part_data(self, data, start, end):
+        piece = data[start:end]
+        self.received += len(piece)
+        if self.reservation is not None:
+            self.reservation.cover(self.received)
+        if self._is_file:
+            self.size += len(piece)
+            if self.size > self.max_bytes:
+                raise HTTPException(status_code=413, detail=f"Upload exceeds {self.max_bytes} bytes")
+            self.hasher.update(piece)
+            self.spool.write(piece)
+        else:
+            self._value += piece
+            if len(self._value) > MAX_FIELD_BYTES:
+                raise HTTPException(status_code=413, detail=f"Field {self._name!r} is too large")
+
+    def _on_part_end(self):
+        if not self._is_file and self._name:
+            self.fields[self._name] = self._value.decode("utf-8", "replace")
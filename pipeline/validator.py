@@ -0,0 +1,41 @@
+import copy
+
+SCHEMA = {
+    "title": str,
+    "description": str,
+    "audience": str,
+    "problemStatements": list,
+    "tags": list,
+    "followUpQuestions": list,
+    "burningProblems": list,
+}
+THREE_ITEM_FIELDS = ("problemStatements", "followUpQuestions", "burningProblems")
+
+# Returned when the model output could not be parsed at all
+FALLBACK_RESULT = {
+    "title": "Product Analysis",
+    "description": "Analysis could not be completed",
+    "audience": "",
+    "problemStatements": [],
+    "tags": [],
+    "followUpQuestions": [],
+    "burningProblems": []
+}
+
+
+def validate(parsed: dict | None) -> tuple[dict, list[str]]:
+    """Check the analysis schema; the result is passed through unchanged, problems are listed"""
+    if parsed is None:
+        return copy.deepcopy(FALLBACK_RESULT), ["unparseable model output"]
+
+    errors = []
+    for key, kind in SCHEMA.items():
+        if key not in parsed:
+            errors.append(f"{key}: missing")
+        elif not isinstance(parsed[key], kind):
+            errors.append(f"{key}: expected {kind.__name__}")
+    for key in THREE_ITEM_FIELDS:
+        items = parsed.get(key)
+        if isinstance(items, list) and len(items) != 3:
+            errors.append(f"{key}: expected 3 items, got {len(items)}")
+    return parsed, errors
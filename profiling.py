@@ -0,0 +1,256 @@
+import contextvars
+import cProfile
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
+
+from admission import after_body
+from pipeline import Hook
+
+MODES = ("cprofile", "sample")
+SAMPLE_INTERVAL = 0.005
+KEEP_PROFILES = 50
+PROFILE_ID = re.compile(r"^[0-9]{8}T[0-9]{6}-[0-9a-f]{8}$")
+
+current_capture = contextvars.ContextVar("current_capture", default=None)
+
+
+@dataclass(slots=True, eq=False)
+class Capture:
+    """One request's profile. mode "slow" starts sampling once the request passes the threshold"""
+    id: str
+    mode: str
+    path: str
+    start: float = field(default_factory=time.perf_counter)
+    profile: cProfile.Profile | None = None
+    samples: Counter = field(default_factory=Counter)
+    # thread id -> stage currently running on it
+    threads: dict = field(default_factory=dict)
+    timings: dict = field(default_factory=dict)
+    errors: list = field(default_factory=list)
+
+
+class ProfileHook(Hook):
+    """Attaches the pipeline's stage threads to the request's capture; a no-op without one"""
+
+    def around(self, stage, run, call):
+        capture = current_capture.get()
+        if capture is None:
+            return call()
+
+        capture.timings = run.timings
+        thread_id = threading.get_ident()
+        capture.threads[thread_id] = stage
+        enabled = False
+        if capture.profile is not None:
+            try:
+                capture.profile.enable()
+                enabled = True
+            except ValueError as e:
+                # Python 3.12+ allows one active cProfile per process
+                capture.errors.append(f"{stage}: {e}")
+        try:
+            return call()
+        finally:
+            if enabled:
+                capture.profile.disable()
+            capture.threads.pop(thread_id, None)
+
+
+# === Request Profiler ===
+class RequestProfiler:
+    """Profiles single requests on demand (X-Profile header or ?profile=) and, with
+    slow_seconds set, samples any request still running after that long.
+
+    cProfile captures are saved as .prof (pstats / snakeviz), sampled ones as
+    collapsed stacks (.folded, for flamegraph.pl or speedscope), each with a
+    .json sidecar, so every worker sharing the directory lists the same profiles.
+    Only the pipeline stage threads are profiled; map-reduce's summary calls
+    run on their own pool and show up as time spent waiting in the pack stage.
+    """
+
+    def __init__(self, directory: str = "profiles", slow_seconds: float | None = None,
+                 interval: float = SAMPLE_INTERVAL, keep: int = KEEP_PROFILES):
+        self.directory = directory
+        self.slow_seconds = slow_seconds
+        self.interval = interval
+        self.keep = keep
+        self.active = set()
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.sampler = None
+
+    @classmethod
+    def from_env(cls) -> "RequestProfiler":
+        slow_seconds = os.environ.get("PROFILE_SLOW_SECONDS")
+        return cls(
+            directory=os.environ.get("PROFILE_DIR", "profiles"),
+            slow_seconds=float(slow_seconds) if slow_seconds else None,
+        )
+
+    def hook(self) -> ProfileHook:
+        return ProfileHook()
+
+    def start(self, mode: str, path: str) -> Capture:
+        capture = Capture(id=f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}", mode=mode, path=path)
+        if mode == "cprofile":
+            capture.profile = cProfile.Profile()
+            return capture
+        with self.lock:
+            self.active.add(capture)
+            if self.sampler is None:
+                self.sampler = threading.Thread(target=self._sample_loop, name="profile-sampler", daemon=True)
+                self.sampler.start()
+        self.wake.set()
+        return capture
+
+    def worth_keeping(self, capture: Capture) -> bool:
+        """Once True it stays True: a slow capture only gets older and gains samples"""
+        if capture.mode != "slow":
+            return True
+        return time.perf_counter() - capture.start >= self.slow_seconds and bool(capture.samples)
+
+    def finish(self, capture: Capture, status_code: int | None = None) -> bool:
+        """Write the capture to disk; returns False when there was nothing worth keeping"""
+        seconds = time.perf_counter() - capture.start
+        with self.lock:
+            self.active.discard(capture)
+        if not self.worth_keeping(capture):
+            return False
+
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, capture.id)
+        if capture.profile is not None:
+            filename = capture.id + ".prof"
+            capture.profile.dump_stats(base + ".prof")
+        else:
+            filename = capture.id + ".folded"
+            with open(base + ".folded", "w", encoding="utf-8") as f:
+                for stack, count in capture.samples.most_common():
+                    f.write(f"{stack} {count}\n")
+        meta = {
+            "id": capture.id,
+            "mode": capture.mode,
+            "path": capture.path,
+            "status_code": status_code,
+            "seconds": round(seconds, 4),
+            "timings": {stage: round(value, 4) for stage, value in capture.timings.items()},
+            "samples": sum(capture.samples.values()),
+            "errors": capture.errors,
+            "file": filename,
+        }
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        self._prune()
+        return True
+
+    def _prune(self):
+        sidecars = sorted(name for name in os.listdir(self.directory) if name.endswith(".json"))
+        for name in sidecars[:-self.keep]:
+            for ext in (".json", ".prof", ".folded"):
+                try:
+                    os.remove(os.path.join(self.directory, name[:-5] + ext))
+                except FileNotFoundError:
+                    pass
+
+    def _sample_loop(self):
+        while True:
+            with self.lock:
+                active = list(self.active)
+            if not active:
+                self.wake.wait()
+                self.wake.clear()
+                continue
+            now = time.perf_counter()
+            due = [c for c in active if c.mode != "slow" or now - c.start >= self.slow_seconds]
+            if not due:
+                # Nothing to sample until the oldest slow request passes the threshold
+                # (or a sample capture starts); don't grab frames before then
+                self.wake.wait(min(c.start for c in active) + self.slow_seconds - now)
+                self.wake.clear()
+                continue
+            frames = sys._current_frames()
+            for capture in due:
+                for thread_id, stage in list(capture.threads.items()):
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        capture.samples[_collapse(stage, frame)] += 1
+            del frames
+            time.sleep(self.interval)
+
+    def list(self) -> list[dict]:
+        if not os.path.isdir(self.directory):
+            return []
+        profiles = []
+        for name in sorted(os.listdir(self.directory), reverse=True):
+            if name.endswith(".json"):
+                try:
+                    with open(os.path.join(self.directory, name), encoding="utf-8") as f:
+                        profiles.append(json.load(f))
+                except (OSError, ValueError):
+                    continue
+        return profiles
+
+    def install(self, app, paths=("/idea-capture",)):
+        """Profile requests to `paths` on demand and expose GET /profiles and GET /profiles/{id}"""
+
+        @app.middleware("http")
+        async def profile_request(request, call_next):
+            if request.url.path not in paths:
+                return await call_next(request)
+
+            mode = request.headers.get("X-Profile") or request.query_params.get("profile")
+            if mode not in MODES:
+                mode = "slow" if self.slow_seconds is not None else None
+            if mode is None:
+                return await call_next(request)
+
+            capture = self.start(mode, request.url.path)
+            token = current_capture.set(capture)
+            try:
+                response = await call_next(request)
+            except BaseException:
+                await run_in_threadpool(self.finish, capture)
+                raise
+            finally:
+                current_capture.reset(token)
+            # A streamed body keeps running pipeline stages after the headers are sent,
+            # so the capture is written once the body is done; the header is only set
+            # when it is already certain to be kept
+            if self.worth_keeping(capture):
+                response.headers["X-Profile-Id"] = capture.id
+            after_body(response, lambda: run_in_threadpool(self.finish, capture, response.status_code))
+            return response
+
+        @app.get("/profiles")
+        def list_profiles():
+            return self.list()
+
+        @app.get("/profiles/{profile_id}")
+        def download_profile(profile_id: str):
+            if PROFILE_ID.match(profile_id):
+                for ext in (".prof", ".folded"):
+                    path = os.path.join(self.directory, profile_id + ext)
+                    if os.path.exists(path):
+                        return FileResponse(path, filename=profile_id + ext)
+            raise HTTPException(status_code=404, detail="Profile not found")
+
+
+def _collapse(stage: str, frame) -> str:
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    stack.append(f"stage:{stage}")
+    return ";".join(reversed(stack))
@@ -0,0 +1,209 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS cache_stored_at ON cache (namespace, stored_at);
+
+CREATE TABLE IF NOT EXISTS samples (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS samples_key ON samples (name, key, id);
+
+CREATE TABLE IF NOT EXISTS buckets (
+    name TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+MMAP_BYTES = 64 * 1024 * 1024
+BUSY_TIMEOUT_SECONDS = 5.0
+# Waits are capped so a worker re-checks the bucket at least this often
+MAX_BUCKET_SLEEP = 0.5
+
+
+# === Shared State ===
+class SharedState:
+    """One local SQLite file (WAL, memory-mapped) shared by every worker on the host.
+
+    Each process opens its own connection and reopens it after a fork, so the
+    same object works under `uvicorn --workers N` and gunicorn with --preload.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.pid = None
+        self._conn = None
+        with self.lock:
+            self.conn.executescript(SCHEMA)
+
+    @classmethod
+    def from_env(cls, name: str = "SHARED_STATE_PATH") -> "SharedState | None":
+        path = os.environ.get(name)
+        return cls(path) if path else None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        # Callers hold self.lock
+        if self.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_SECONDS,
+                                   isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA mmap_size={MMAP_BYTES}")
+            self._conn = conn
+            self.pid = os.getpid()
+        return self._conn
+
+    def cache(self, namespace: str, maxsize: int = 1024, encode=None, decode=None) -> "SharedCache":
+        return SharedCache(self, namespace, maxsize, encode, decode)
+
+    def bucket(self, name: str, rate: float, capacity: float) -> "TokenBucket":
+        return TokenBucket(self, name, rate, capacity)
+
+    def window(self, name: str, maxlen: int) -> "SampleWindow":
+        return SampleWindow(self, name, maxlen)
+
+
+class SharedCache:
+    """Cross-process cache in one namespace of a SharedState; oldest entries are evicted first.
+
+    Values are stored as JSON; encode/decode convert to and from JSON-able
+    objects (e.g. Deck.to_dict / Deck.from_dict). Same get/put/save interface
+    as map_reduce.MapCache.
+    """
+
+    def __init__(self, state: SharedState, namespace: str, maxsize: int = 1024, encode=None, decode=None):
+        self.state = state
+        self.namespace = namespace
+        self.maxsize = maxsize
+        self.encode = encode
+        self.decode = decode
+
+    def get(self, key: str):
+        with self.state.lock:
+            row = self.state.conn.execute(
+                "SELECT value FROM cache WHERE namespace = ? AND key = ?", (self.namespace, key)
+            ).fetchone()
+        if row is None:
+            return None
+        value = json.loads(row[0])
+        return self.decode(value) if self.decode else value
+
+    def put(self, key: str, value):
+        data = json.dumps(self.encode(value) if self.encode else value)
+        with self.state.lock:
+            conn = self.state.conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache (namespace, key, value, stored_at) VALUES (?, ?, ?, ?)",
+                    (self.namespace, key, data, time.time()),
+                )
+                conn.execute(
+                    "DELETE FROM cache WHERE namespace = ? AND key IN (SELECT key FROM cache"
+                    " WHERE namespace = ? ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                    (self.namespace, self.namespace, self.maxsize),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def save(self):
+        """Writes are already durable"""
+
+
+class SampleWindow:
+    """The last `maxlen` values appended under each key, shared by every worker"""
+
+    def __init__(self, state: SharedState, name: str, maxlen: int):
+        self.state = state
+        self.name = name
+        self.maxlen = maxlen
+
+    def values(self, key: str) -> list[float]:
+        with self.state.lock:
+            rows = self.state.conn.execute(
+                "SELECT value FROM samples WHERE name = ? AND key = ? ORDER BY id", (self.name, key)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def append(self, key: str, value: float):
+        with self.state.lock:
+            conn = self.state.conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("INSERT INTO samples (name, key, value) VALUES (?, ?, ?)", (self.name, key, value))
+                conn.execute(
+                    "DELETE FROM samples WHERE name = ? AND key = ? AND id IN (SELECT id FROM samples"
+                    " WHERE name = ? AND key = ? ORDER BY id DESC LIMIT -1 OFFSET ?)",
+                    (self.name, key, self.name, key, self.maxlen),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+
+class TokenBucket:
+    """Host-wide rate limit: `rate` tokens per second, bursting up to `capacity`"""
+
+    def __init__(self, state: SharedState, name: str, rate: float, capacity: float):
+        self.state = state
+        self.name = name
+        self.rate = rate
+        self.capacity = capacity
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """Take the tokens and return 0, or return how long to wait before trying again"""
+        tokens = min(tokens, self.capacity)
+        with self.state.lock:
+            conn = self.state.conn
+            # IMMEDIATE takes the write lock up front, so refill-and-take is atomic across workers
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = conn.execute(
+                    "SELECT tokens, updated_at FROM buckets WHERE name = ?", (self.name,)
+                ).fetchone()
+                available = self.capacity if row is None else min(
+                    self.capacity, row[0] + max(0.0, now - row[1]) * self.rate
+                )
+                wait = 0.0
+                if available >= tokens:
+                    available -= tokens
+                else:
+                    wait = (tokens - available) / self.rate
+                conn.execute(
+                    "INSERT OR REPLACE INTO buckets (name, tokens, updated_at) VALUES (?, ?, ?)",
+                    (self.name, available, now),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return wait
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Block until the tokens are taken; returns the seconds spent waiting"""
+        start = time.perf_counter()
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait == 0.0:
+                return time.perf_counter() - start
+            time.sleep(min(wait, MAX_BUCKET_SLEEP))